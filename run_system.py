@@ -3,22 +3,52 @@ GovAI Platform - Complete Setup and Launch Script
 Trains models using real data and starts the full system
 """
 
+import asyncio
+import hashlib
+import json
 import subprocess
 import sys
+import sysconfig
 import os
+import signal
 import time
+from importlib.metadata import distribution, PackageNotFoundError
 from pathlib import Path
 
+# Resolved once; every child server is launched with this interpreter
+PYEXE = sys.executable
+
 def print_header(title):
     """Print formatted header"""
     print("\n" + "=" * 60)
     print(f"🚀 {title}")
     print("=" * 60)
 
+DEPS_CACHE_FILE = Path.home() / ".govai_deps_cache.json"
+DEPS_CACHE_TTL = 600  # seconds
+
+def deps_cache_key():
+    """Identify the current environment by interpreter and site-packages mtime"""
+    site_packages = Path(sysconfig.get_paths()['purelib'])
+    fingerprint = sys.executable + str(site_packages.stat().st_mtime)
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+def deps_recently_checked():
+    """Return True if dependencies were verified for this environment recently"""
+    try:
+        cache = json.loads(DEPS_CACHE_FILE.read_text())
+        return cache['key'] == deps_cache_key() and time.time() - cache['checked_at'] < DEPS_CACHE_TTL
+    except (OSError, ValueError, KeyError):
+        return False
+
 def check_dependencies():
     """Check if required packages are installed"""
     print_header("CHECKING DEPENDENCIES")
     
+    if deps_recently_checked():
+        print("✅ Dependencies verified recently, skipping check")
+        return
+    
     required_packages = [
         'pandas', 'numpy', 'scikit-learn', 'fastapi', 
         'uvicorn', 'joblib'
@@ -27,37 +57,45 @@ def check_dependencies():
     missing_packages = []
     
     for package in required_packages:
+        # Look up installed metadata instead of importing the (heavy) package
         try:
-            __import__(package.replace('-', '_'))
+            distribution(package.lower().replace('_', '-'))
             print(f"✅ {package}")
-        except ImportError:
+        except PackageNotFoundError:
             print(f"❌ {package} - MISSING")
             missing_packages.append(package)
     
     if missing_packages:
         print(f"\n📦 Installing missing packages: {', '.join(missing_packages)}")
-        for package in missing_packages:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing_packages])
         print("✅ All dependencies installed!")
     else:
         print("✅ All dependencies are available!")
+    
+    try:
+        DEPS_CACHE_FILE.write_text(json.dumps({'key': deps_cache_key(), 'checked_at': time.time()}))
+    except OSError:
+        pass  # Caching is best-effort
 
 def train_models():
     """Train all ML models using real data"""
     print_header("TRAINING ML MODELS")
     
+    if not Path("train_models.py").exists():
+        print("❌ train_models.py not found, skipping training")
+        return False
+    
     try:
         print("🏋️ Starting model training pipeline...")
-        result = subprocess.run([sys.executable, "train_models.py"], 
-                              capture_output=True, text=True, timeout=300)
+        # Output is streamed to the console as training runs instead of being buffered
+        result = subprocess.run([sys.executable, "train_models.py"], timeout=300)
         
         if result.returncode == 0:
             print("✅ Model training completed successfully!")
             print("📁 Models saved in: ./models/")
             return True
         else:
-            print("❌ Model training failed!")
-            print("Error output:", result.stderr)
+            print("❌ Model training failed! See output above.")
             return False
             
     except subprocess.TimeoutExpired:
@@ -67,7 +105,22 @@ def train_models():
         print(f"❌ Training error: {e}")
         return False
 
-def start_backend():
+LOG_DIR = Path("logs")
+LOG_TAIL_BYTES = 4096
+
+def open_logs(name):
+    """Open append-mode stdout/stderr log files for a child process"""
+    LOG_DIR.mkdir(exist_ok=True)
+    return open(LOG_DIR / f"{name}.out", "ab"), open(LOG_DIR / f"{name}.err", "ab")
+
+def tail_log(path, size=LOG_TAIL_BYTES):
+    """Return the last `size` bytes of a log file as text"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - size))
+        return f.read().decode(errors='replace')
+
+async def start_backend():
     """Start the FastAPI backend server"""
     print_header("STARTING BACKEND SERVER")
     
@@ -75,54 +128,56 @@ def start_backend():
         print("🚀 Starting FastAPI backend on http://localhost:8000")
         print("📚 API Documentation will be available at: http://localhost:8000/docs")
         
-        # Start backend in background
-        backend_process = subprocess.Popen(
-            [sys.executable, "api/backend.py"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
+        # Start backend in background, logging to files rather than pipes
+        out, err = open_logs("backend")
+        with out, err:
+            backend_process = await asyncio.create_subprocess_exec(
+                PYEXE, "api/backend.py",
+                stdout=out,
+                stderr=err,
+                close_fds=True,
+                start_new_session=True
+            )
         
         # Give it a moment to start
-        time.sleep(3)
+        await asyncio.sleep(3)
         
         # Check if process is still running
-        if backend_process.poll() is None:
+        if backend_process.returncode is None:
             print("✅ Backend server started successfully!")
             return backend_process
         else:
             print("❌ Backend server failed to start")
-            stdout, stderr = backend_process.communicate()
-            print("Error:", stderr.decode())
+            print("Error:", tail_log(LOG_DIR / "backend.err"))
             return None
             
     except Exception as e:
         print(f"❌ Backend startup error: {e}")
         return None
 
-def start_frontend():
+async def start_frontend():
     """Start the frontend HTTP server"""
     print_header("STARTING FRONTEND SERVER")
     
     try:
         print("🌐 Starting frontend server on http://localhost:3000")
         
-        # Change to frontend directory
-        os.chdir("frontend")
-        
-        # Start simple HTTP server
-        frontend_process = subprocess.Popen(
-            [sys.executable, "-m", "http.server", "3000"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        # Change back to main directory
-        os.chdir("..")
+        # Start simple HTTP server serving the frontend directory
+        out, err = open_logs("frontend")
+        with out, err:
+            frontend_process = await asyncio.create_subprocess_exec(
+                PYEXE, "-m", "http.server", "3000",
+                cwd="frontend",
+                stdout=out,
+                stderr=err,
+                close_fds=True,
+                start_new_session=True
+            )
         
         # Give it a moment to start
-        time.sleep(2)
+        await asyncio.sleep(2)
         
-        if frontend_process.poll() is None:
+        if frontend_process.returncode is None:
             print("✅ Frontend server started successfully!")
             print("🌐 Open http://localhost:3000 in your browser")
             return frontend_process
@@ -134,34 +189,38 @@ def start_frontend():
         print(f"❌ Frontend startup error: {e}")
         return None
 
-def test_system():
+async def test_system():
     """Test if the system is working"""
     print_header("TESTING SYSTEM")
     
     try:
         import requests
+        from requests.adapters import HTTPAdapter
         
-        # Test backend health
+        # Probe backend and frontend concurrently over one pooled session
         print("🔍 Testing backend health...")
-        response = requests.get("http://localhost:8000/api/health", timeout=10)
+        print("🌐 Testing frontend...")
+        loop = asyncio.get_running_loop()
+        with requests.Session() as session:
+            session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+            backend_response, frontend_response = await asyncio.gather(
+                loop.run_in_executor(None, lambda: session.get("http://localhost:8000/api/health", timeout=10)),
+                loop.run_in_executor(None, lambda: session.get("http://localhost:3000", timeout=5))
+            )
         
-        if response.status_code == 200:
-            data = response.json()
+        if backend_response.status_code == 200:
+            data = backend_response.json()
             print("✅ Backend health check passed!")
             print(f"   Fraud Detection: {data.get('fraud_detection_accuracy', 0):.1%}")
             print(f"   Chatbot: {data.get('chatbot_accuracy', 0):.1%}")
             print(f"   Analytics: {data.get('analytics_accuracy', 0):.1%}")
         else:
-            print(f"❌ Backend health check failed: {response.status_code}")
-            
-        # Test frontend
-        print("🌐 Testing frontend...")
-        response = requests.get("http://localhost:3000", timeout=5)
+            print(f"❌ Backend health check failed: {backend_response.status_code}")
         
-        if response.status_code == 200:
+        if frontend_response.status_code == 200:
             print("✅ Frontend is accessible!")
         else:
-            print(f"❌ Frontend test failed: {response.status_code}")
+            print(f"❌ Frontend test failed: {frontend_response.status_code}")
             
         return True
         
@@ -169,7 +228,33 @@ def test_system():
         print(f"❌ System test failed: {e}")
         return False
 
-def main():
+def stop_process(process):
+    """Terminate a server and everything in its session (e.g. uvicorn workers)"""
+    if process.returncode is not None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            # Servers are started with start_new_session=True, so pgid == pid
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+    except ProcessLookupError:
+        pass  # Already exited but not yet reaped
+
+async def wait_for_exit(processes):
+    """Block until one of the given processes exits and return its label"""
+    waiters = {
+        asyncio.ensure_future(process.wait()): label
+        for label, process in processes.items() if process
+    }
+    try:
+        done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+    return waiters[done.pop()]
+
+async def main():
     """Main setup and launch function"""
     print_header("GOVAI PLATFORM SETUP & LAUNCH")
     print("🏛️ Government AI Transparency Platform")
@@ -183,67 +268,50 @@ def main():
     if not training_success:
         print("⚠️  Continuing with existing models or fallback...")
     
-    # Step 3: Start backend
-    backend_process = start_backend()
-    if not backend_process:
-        print("❌ Cannot start system without backend")
-        return False
-    
-    # Step 4: Start frontend  
-    frontend_process = start_frontend()
-    
-    # Step 5: Test system
-    time.sleep(2)  # Give servers time to fully start
-    test_system()
-    
-    # Final instructions
-    print_header("SYSTEM READY")
-    print("🎉 GovAI Platform is now running!")
-    print()
-    print("🌐 Frontend: http://localhost:3000")
-    print("🔧 Backend API: http://localhost:8000")
-    print("📚 API Docs: http://localhost:8000/docs")
-    print()
-    print("🔍 Features Available:")
-    print("   • Contract fraud detection with real data")
-    print("   • Multilingual government services chatbot")
-    print("   • Government expenditure analytics")
-    print("   • Contract database exploration")
-    print()
-    print("⚠️  Press Ctrl+C to stop all servers")
-    
+    # Step 3 & 4: Start backend and frontend concurrently
+    backend_process, frontend_process = await asyncio.gather(start_backend(), start_frontend())
     try:
-        # Keep the script running to maintain servers
-        while True:
-            time.sleep(1)
-            
-            # Check if processes are still running
-            if backend_process and backend_process.poll() is not None:
-                print("❌ Backend process died")
-                break
-                
-            if frontend_process and frontend_process.poll() is not None:
-                print("❌ Frontend process died")
-                break
-                
-    except KeyboardInterrupt:
-        print("\n🛑 Shutting down servers...")
+        if not backend_process:
+            print("❌ Cannot start system without backend")
+            return False
         
-        if backend_process:
-            backend_process.terminate()
-            print("✅ Backend stopped")
-            
-        if frontend_process:
-            frontend_process.terminate()
-            print("✅ Frontend stopped")
-            
-        print("👋 GovAI Platform stopped successfully!")
-    
-    return True
+        # Step 5: Test system
+        await test_system()
+        
+        # Final instructions
+        print_header("SYSTEM READY")
+        print("🎉 GovAI Platform is now running!")
+        print()
+        print("🌐 Frontend: http://localhost:3000")
+        print("🔧 Backend API: http://localhost:8000")
+        print("📚 API Docs: http://localhost:8000/docs")
+        print()
+        print("🔍 Features Available:")
+        print("   • Contract fraud detection with real data")
+        print("   • Multilingual government services chatbot")
+        print("   • Government expenditure analytics")
+        print("   • Contract database exploration")
+        print()
+        print("⚠️  Press Ctrl+C to stop all servers")
+        
+        try:
+            # Block until a server exits instead of polling them every second
+            dead = await wait_for_exit({"Backend": backend_process, "Frontend": frontend_process})
+            print(f"❌ {dead} process died")
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            print("\n🛑 Shutting down servers...")
+        
+        return True
+    finally:
+        # Servers run in their own sessions, so they won't see the terminal's
+        # Ctrl+C once we exit - stop whichever one is still up, however main ends
+        for process in (backend_process, frontend_process):
+            if process:
+                stop_process(process)
 
 if __name__ == "__main__":
     try:
-        success = main()
+        success = asyncio.run(main())
         if success:
             print("✅ Setup completed successfully!")
         else:
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+GovAI Model Export Script
+Converts the optimized scaler + fraud detector to a single ONNX graph for onnxruntime inference
+Requires: pip install skl2onnx onnxruntime
+"""
+
+import json
+import os
+
+import joblib
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.pipeline import Pipeline
+
+CONFIG_PATH = "models/final/latest_optimized_config.json"
+
+def export_onnx():
+    """Write <model_file>.onnx next to the pickled model and record it in the config"""
+    
+    print("🔄 Exporting fraud detector to ONNX...")
+    
+    if not os.path.exists(CONFIG_PATH):
+        print(f"❌ Config not found: {CONFIG_PATH}")
+        return False
+    
+    with open(CONFIG_PATH) as f:
+        config = json.load(f)
+    
+    model_file = config.get('model_file')
+    if not model_file or not os.path.exists(model_file):
+        print(f"❌ Model file not found: {model_file}")
+        return False
+    
+    scaler_file = config.get('scaler_file')
+    if not scaler_file or not os.path.exists(scaler_file):
+        print(f"❌ Scaler file not found: {scaler_file}")
+        return False
+    
+    # Export scaler and model as one graph so the server feeds raw features
+    model = joblib.load(model_file)
+    pipeline = Pipeline([("scale", joblib.load(scaler_file)), ("model", model)])
+    initial_types = [("X", FloatTensorType([None, len(config['features'])]))]
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=initial_types,
+        options={id(model): {'zipmap': False}}
+    )
+    
+    onnx_file = os.path.splitext(model_file)[0] + ".onnx"
+    with open(onnx_file, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    
+    config['onnx_file'] = onnx_file
+    with open(CONFIG_PATH, "w") as f:
+        json.dump(config, f, indent=2)
+    
+    print(f"✅ ONNX model saved: {onnx_file}")
+    return True
+
+if __name__ == "__main__":
+    success = export_onnx()
+    if success:
+        print("\n🎉 ONNX export completed successfully!")
+    else:
+        print("\n❌ ONNX export failed!")
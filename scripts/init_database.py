@@ -6,9 +6,104 @@ Creates SQLite database and loads data from CSV files
 
 import sqlite3
 import pandas as pd
+import numpy as np
 import os
+import json
+from functools import lru_cache
 from pathlib import Path
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cnic TEXT,
+    name TEXT,
+    language TEXT DEFAULT 'english',
+    phone TEXT,
+    email TEXT,
+    address TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS bills (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT,
+    cnic TEXT,
+    amount REAL,
+    date TEXT,
+    consumption REAL,
+    bill_type TEXT DEFAULT 'electricity',
+    status TEXT DEFAULT 'pending',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (cnic) REFERENCES users (cnic)
+);
+
+CREATE TABLE IF NOT EXISTS contracts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contract_number TEXT,
+    description TEXT,
+    amount REAL,
+    supplier TEXT,
+    country TEXT,
+    date_signed TEXT,
+    risk_score REAL DEFAULT 0.0,
+    risk_level TEXT DEFAULT 'LOW',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS chat_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    message TEXT,
+    response TEXT,
+    language TEXT,
+    intent TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_bills_cnic ON bills(cnic);
+CREATE INDEX IF NOT EXISTS idx_contracts_risk ON contracts(risk_level);
+CREATE INDEX IF NOT EXISTS idx_contracts_supplier ON contracts(supplier);
+CREATE INDEX IF NOT EXISTS idx_chat_user ON chat_logs(user_id, timestamp);
+"""
+
+# Risk score bucket edges: (0, 0.3] LOW, (0.3, 0.6] MEDIUM, (0.6, 0.8] HIGH, above CRITICAL
+RISK_THRESHOLDS = np.array([0.3, 0.6, 0.8])
+RISK_LEVELS = np.array(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
+
+def bulk_insert(conn, table, df):
+    """Insert a DataFrame with one executemany, keeping INSERT OR IGNORE semantics.
+    
+    Runs on the caller's open transaction (pandas' to_sql would commit it).
+    Returns the number of rows actually inserted.
+    """
+    columns = ", ".join(df.columns)
+    placeholders = ", ".join("?" * len(df.columns))
+    # NaN/None become NULL, as to_sql would store them
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    return conn.executemany(
+        f"INSERT OR IGNORE INTO {table} ({columns}) VALUES ({placeholders})", rows
+    ).rowcount
+
+FALLBACK_SAMPLES_PATH = "data/fallback_samples.json"
+
+@lru_cache(maxsize=1)
+def _read_fallback_samples():
+    with open(FALLBACK_SAMPLES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def fallback_samples(table):
+    """Sample rows for `table`, used when its source CSV is missing"""
+    samples = _read_fallback_samples()[table]
+    return pd.DataFrame(samples['rows'], columns=samples['columns'])
+
+def text_column(df, col, default, max_len):
+    """Return `col` as truncated strings, or `default` for every row if it is missing"""
+    if col not in df.columns:
+        return np.full(len(df), default)
+    return df[col].astype(str).str[:max_len].to_numpy()
+
 def init_database():
     """Initialize SQLite database with government data"""
     print("🗄️ Initializing GovAI Database...")
@@ -21,221 +116,175 @@ def init_database():
     
     # Connect to database
     conn = sqlite3.connect(db_path)
+    
+    # Bulk-load tuning: this is a one-off init script, so relaxed durability is fine
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
     cursor = conn.cursor()
     
     try:
-        # Create users table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            cnic TEXT UNIQUE,
-            name TEXT,
-            language TEXT DEFAULT 'english',
-            phone TEXT,
-            email TEXT,
-            address TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        # Create bills table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS bills (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            account TEXT,
-            cnic TEXT,
-            amount REAL,
-            date TEXT,
-            consumption REAL,
-            bill_type TEXT DEFAULT 'electricity',
-            status TEXT DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (cnic) REFERENCES users (cnic)
-        )
-        """)
-        
-        # Create contracts table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS contracts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            contract_number TEXT UNIQUE,
-            description TEXT,
-            amount REAL,
-            supplier TEXT,
-            country TEXT,
-            date_signed TEXT,
-            risk_score REAL DEFAULT 0.0,
-            risk_level TEXT DEFAULT 'LOW',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        # Create chat_logs table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS chat_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            message TEXT,
-            response TEXT,
-            language TEXT,
-            intent TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
+        # Create tables in a single script
+        conn.executescript(SCHEMA)
         
         print("✅ Database tables created successfully")
         
+        # Load everything inside one transaction instead of per-statement commits
+        conn.execute("BEGIN")
+        
         # Load users data
         try:
             users_df = pd.read_csv("data/users.csv")
             print(f"📊 Loading {len(users_df)} users...")
             
-            # Sample CNIC generation for users without CNIC
-            for idx, row in users_df.iterrows():
-                cnic = f"42101-{str(idx+1000000)[:7]}-{(idx % 10)+1}"
-                name = row.get('name', f'User_{idx+1}')
-                language = 'urdu' if idx % 2 == 0 else 'english'
-                
-                cursor.execute("""
-                INSERT OR IGNORE INTO users (cnic, name, language)
-                VALUES (?, ?, ?)
-                """, (cnic, name, language))
+            # Sample CNIC generation for users without CNIC (vectorized)
+            idx = users_df.index.to_numpy()
+            cnics = np.char.add(
+                np.char.add('42101-', (idx + 1000000).astype('U7')),
+                np.char.add('-', ((idx % 10) + 1).astype(str))
+            )
+            if 'name' in users_df.columns:
+                names = users_df['name'].to_numpy()
+            else:
+                names = np.char.add('User_', (idx + 1).astype(str))
+            languages = np.where(idx % 2 == 0, 'urdu', 'english')
+            
+            # Keep the first row per CNIC (same as INSERT OR IGNORE)
+            _, first = np.unique(cnics, return_index=True)
+            keep = np.sort(first)
+            
+            user_count = cursor.executemany("""
+            INSERT OR IGNORE INTO users (cnic, name, language)
+            VALUES (?, ?, ?)
+            """, zip(cnics[keep].tolist(), names[keep].tolist(), languages[keep].tolist())).rowcount
             
             print("✅ Users data loaded")
         except FileNotFoundError:
             print("⚠️ users.csv not found, creating sample data...")
             # Create sample users
-            sample_users = [
-                ("42101-1234567-1", "احمد علی", "urdu"),
-                ("42101-2345678-2", "فاطمہ خان", "urdu"),
-                ("42101-3456789-3", "John Smith", "english"),
-                ("42101-4567890-4", "Maria Garcia", "english"),
-                ("42101-5678901-5", "محمد حسن", "urdu")
-            ]
-            
-            cursor.executemany("""
-            INSERT OR IGNORE INTO users (cnic, name, language)
-            VALUES (?, ?, ?)
-            """, sample_users)
+            user_count = bulk_insert(conn, 'users', fallback_samples('users'))
             
             print("✅ Sample users created")
         
         # Load household power consumption data as bills
         try:
-            power_df = pd.read_csv("data/Household_power_consumption.csv")
+            # Only the first 1000 readings of one column are used, so don't parse the rest
+            power_df = pd.read_csv(
+                "data/Household_power_consumption.csv",
+                usecols=lambda col: col == 'Global_active_power',
+                dtype={'Global_active_power': 'float32'},
+                na_values=['?'],
+                nrows=1000
+            )
             print(f"📊 Loading {len(power_df)} power consumption records...")
             
-            # Sample bill data from power consumption
-            for idx in range(min(1000, len(power_df))):
-                row = power_df.iloc[idx]
-                
-                # Generate account and associate with random user
-                account = f"PWR-{str(idx+100000)[:6]}"
-                cnic = f"42101-{str((idx % 5)+1234567)}-{(idx % 9)+1}"
-                
-                # Calculate amount based on consumption
-                consumption = float(row.get('Global_active_power', 0) or 0)
-                amount = consumption * 15.5  # Sample rate per kWh
-                
-                cursor.execute("""
-                INSERT OR IGNORE INTO bills (account, cnic, amount, consumption, bill_type)
-                VALUES (?, ?, ?, ?, ?)
-                """, (account, cnic, round(amount, 2), round(consumption, 3), "electricity"))
+            # Generate accounts and associate with random users (vectorized)
+            n_bills = min(1000, len(power_df))
+            bill_idx = np.arange(n_bills)
+            accounts = np.char.add('PWR-', (bill_idx + 100000).astype('U6'))
+            bill_cnics = np.char.add(
+                np.char.add('42101-', ((bill_idx % 5) + 1234567).astype(str)),
+                np.char.add('-', ((bill_idx % 9) + 1).astype(str))
+            )
+            
+            # Sample bill data from power consumption, one contiguous float32 column.
+            # Upcast before rounding so stored values don't carry float32 noise.
+            if 'Global_active_power' in power_df.columns:
+                power = power_df['Global_active_power'].to_numpy(dtype='float32')[:n_bills]
+            else:
+                power = np.zeros(n_bills, dtype='float32')
+            consumption = power.astype(np.float64)
+            
+            bill_count = bulk_insert(conn, 'bills', pd.DataFrame({
+                'account': accounts,
+                'cnic': bill_cnics,
+                'amount': (consumption * 15.5).round(2),  # Sample rate per kWh
+                'consumption': consumption.round(3),
+                'bill_type': 'electricity'
+            }))
             
             print("✅ Bills data loaded")
         except FileNotFoundError:
             print("⚠️ Household_power_consumption.csv not found, creating sample bills...")
             # Create sample bills
-            sample_bills = [
-                ("PWR-100001", "42101-1234567-1", 2500.50, 125.2, "electricity"),
-                ("GAS-100002", "42101-2345678-2", 1800.75, 89.3, "gas"),
-                ("WTR-100003", "42101-3456789-3", 950.25, 45.1, "water"),
-                ("PWR-100004", "42101-4567890-4", 3200.80, 160.4, "electricity"),
-                ("GAS-100005", "42101-5678901-5", 2100.60, 105.8, "gas")
-            ]
-            
-            cursor.executemany("""
-            INSERT OR IGNORE INTO bills (account, cnic, amount, consumption, bill_type)
-            VALUES (?, ?, ?, ?, ?)
-            """, sample_bills)
+            bill_count = bulk_insert(conn, 'bills', fallback_samples('bills'))
             
             print("✅ Sample bills created")
         
         # Load contract data
         try:
-            contracts_df = pd.read_csv("data/Major_Contract_Awards.csv")
+            # Only the first 1000 contracts and a handful of columns are used
+            contract_cols = {
+                'WB Contract Number', 'Contract Description', 'Total Contract Amount (USD)',
+                'Supplier', 'Supplier Country', 'Contract Signing Date'
+            }
+            contracts_df = pd.read_csv(
+                "data/Major_Contract_Awards.csv",
+                usecols=lambda col: col in contract_cols,
+                dtype=str,
+                nrows=1000
+            )
             print(f"📊 Loading {len(contracts_df)} contracts...")
             
-            # Load first 1000 contracts for performance
-            for idx in range(min(1000, len(contracts_df))):
-                row = contracts_df.iloc[idx]
-                
-                contract_number = row.get('WB Contract Number', f'CONTRACT-{idx+1}')
-                description = str(row.get('Contract Description', 'Government Contract'))[:500]
-                
-                # Clean amount field - remove currency symbols and commas
-                amount_str = str(row.get('Total Contract Amount (USD)', '0'))
-                amount_str = amount_str.replace('$', '').replace(',', '').strip()
-                try:
-                    amount = float(amount_str) if amount_str and amount_str != 'nan' else 0.0
-                except:
-                    amount = 0.0
-                
-                supplier = str(row.get('Supplier', 'Unknown Supplier'))[:200]
-                country = str(row.get('Supplier Country', 'Unknown'))[:100]
-                date_signed = str(row.get('Contract Signing Date', '2023-01-01'))[:10]
-                
-                # Simple risk calculation
-                risk_score = min(1.0, amount / 10000000)  # Higher amounts = higher risk
-                if risk_score > 0.8:
-                    risk_level = 'CRITICAL'
-                elif risk_score > 0.6:
-                    risk_level = 'HIGH'
-                elif risk_score > 0.3:
-                    risk_level = 'MEDIUM'
-                else:
-                    risk_level = 'LOW'
-                
-                cursor.execute("""
-                INSERT OR IGNORE INTO contracts 
-                (contract_number, description, amount, supplier, country, date_signed, risk_score, risk_level)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (contract_number, description, amount, supplier, country, date_signed, risk_score, risk_level))
+            # Clean amount column in one pass - strip currency symbols, commas and spaces
+            if 'Total Contract Amount (USD)' in contracts_df.columns:
+                amounts = pd.to_numeric(
+                    contracts_df['Total Contract Amount (USD)'].str.replace(r'[\$,\s]', '', regex=True),
+                    errors='coerce'
+                ).fillna(0.0).to_numpy()
+            else:
+                amounts = np.zeros(len(contracts_df))
+            
+            # Simple risk calculation - higher amounts = higher risk, bucketed by threshold
+            risk_scores = np.minimum(1.0, amounts / 10000000)
+            risk_levels = RISK_LEVELS[np.searchsorted(RISK_THRESHOLDS, risk_scores)]
+            
+            # Assemble the contracts frame once, column by column
+            n_contracts = len(contracts_df)
+            if 'WB Contract Number' in contracts_df.columns:
+                contract_numbers = contracts_df['WB Contract Number']
+            else:
+                contract_numbers = 'CONTRACT-' + pd.Series(np.arange(1, n_contracts + 1)).astype(str)
+            contracts = pd.DataFrame({
+                'contract_number': contract_numbers.to_numpy(),
+                'description': text_column(contracts_df, 'Contract Description', 'Government Contract', 500),
+                'amount': amounts,
+                'supplier': text_column(contracts_df, 'Supplier', 'Unknown Supplier', 200),
+                'country': text_column(contracts_df, 'Supplier Country', 'Unknown', 100),
+                'date_signed': text_column(contracts_df, 'Contract Signing Date', '2023-01-01', 10),
+                'risk_score': risk_scores,
+                'risk_level': risk_levels
+            })
+            
+            # Keep the first row per contract number (same as INSERT OR IGNORE);
+            # rows without a number are all kept, as the unique index allows many NULLs
+            contract_numbers = contracts['contract_number']
+            contracts = contracts[contract_numbers.isna() | ~contract_numbers.duplicated()]
+            contract_count = bulk_insert(conn, 'contracts', contracts)
             
             print("✅ Contracts data loaded")
         except FileNotFoundError:
             print("⚠️ Major_Contract_Awards.csv not found, creating sample contracts...")
             # Create sample contracts
-            sample_contracts = [
-                ("CONTRACT-001", "Road Construction Project", 5000000.00, "ABC Construction", "Pakistan", "2023-01-15", 0.5, "MEDIUM"),
-                ("CONTRACT-002", "IT Infrastructure Upgrade", 2500000.00, "Tech Solutions Inc", "USA", "2023-02-20", 0.25, "LOW"),
-                ("CONTRACT-003", "Hospital Equipment Purchase", 8000000.00, "MedEquip Ltd", "Germany", "2023-03-10", 0.8, "HIGH"),
-                ("CONTRACT-004", "Water Treatment Plant", 12000000.00, "AquaTech Systems", "Netherlands", "2023-04-05", 1.0, "CRITICAL"),
-                ("CONTRACT-005", "School Building Construction", 3500000.00, "BuildCorp", "Pakistan", "2023-05-12", 0.35, "MEDIUM")
-            ]
-            
-            cursor.executemany("""
-            INSERT OR IGNORE INTO contracts 
-            (contract_number, description, amount, supplier, country, date_signed, risk_score, risk_level)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, sample_contracts)
+            contract_count = bulk_insert(conn, 'contracts', fallback_samples('contracts'))
             
             print("✅ Sample contracts created")
         
-        # Commit changes
-        conn.commit()
-        
-        # Display statistics
-        cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = cursor.fetchone()[0]
+        # Build uniqueness indexes once, after the bulk load, instead of per insert
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_cnic ON users(cnic)")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_contracts_number ON contracts(contract_number)")
         
-        cursor.execute("SELECT COUNT(*) FROM bills")
-        bill_count = cursor.fetchone()[0]
+        # Commit all loaded data in one go
+        conn.commit()
         
-        cursor.execute("SELECT COUNT(*) FROM contracts")
-        contract_count = cursor.fetchone()[0]
+        # Secondary indexes for lookup/analytics queries, built after the load,
+        # then refresh planner statistics
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
         
-        print("\n📈 Database Statistics:")
+        # Display statistics - row counts come from the inserts, no table scans needed
+        print("\n📈 Rows Loaded:")
         print(f"  👥 Users: {user_count:,}")
         print(f"  🧾 Bills: {bill_count:,}")
         print(f"  📋 Contracts: {contract_count:,}")
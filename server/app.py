@@ -3,25 +3,70 @@
 GovAI Platform - FastAPI Backend Server
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+import asyncio
+from collections import Counter
+import json
 import sqlite3
-import pandas as pd
 import numpy as np
-import joblib
 import os
+import random
+import re
+import threading
+import time
 from typing import Optional
+from typing_extensions import Annotated  # typing.Annotated needs Python 3.9
 from datetime import datetime
 import logging
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
+class SampleFilter(logging.Filter):
+    """Let through only a random fraction of records"""
+    
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+    
+    def filter(self, record):
+        return random.random() < self.rate
+
+# Per-request INFO lines are sampled (1% by default) so they stay cheap under load
+request_logger = logging.getLogger(__name__ + ".requests")
+request_logger.addFilter(SampleFilter(float(os.getenv("REQUEST_LOG_SAMPLE", "0.01"))))
+
+try:
+    from enhanced_chatbot import chatbot as enhanced_chatbot
+except ImportError:
+    enhanced_chatbot = None
+
+# orjson encodes the large contract/dashboard payloads several times faster
+try:
+    import orjson  # noqa: F401 - required by ORJSONResponse
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 app = FastAPI(
     title="GovAI Transparency Platform",
     description="Government AI services for fraud detection and citizen assistance",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 app.add_middleware(
@@ -33,25 +78,230 @@ app.add_middleware(
 )
 
 fraud_model = None
+fraud_session = None  # onnxruntime session, when an exported .onnx model is available
 chatbot_model = None
-feature_scaler = None
 feature_names = []
 db_path = "data/govai.db"
 
+# One shared connection, serialized by db_lock across threadpool workers
+db_conn = None
+db_lock = threading.Lock()
+
+class TTLCache:
+    """Small time-based cache for endpoint results"""
+    
+    def __init__(self, ttl, maxsize=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+    
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+    
+    def set(self, key, value):
+        self._data.pop(key, None)
+        if self.maxsize and len(self._data) >= self.maxsize:
+            # Evict the oldest entry
+            del self._data[next(iter(self._data))]
+        self._data[key] = (time.monotonic(), value)
+    
+    def clear(self):
+        self._data.clear()
+
+# Dashboard results are shared by every poller for 30 seconds
+dashboard_cache = TTLCache(ttl=30)
+
+# Bill inquiries keyed by (cnic, account_number); the API never writes bills,
+# so the short TTL alone bounds how stale a response can be
+bill_cache = TTLCache(ttl=60, maxsize=4096)
+
+# Months reported in the dashboard trend chart
+TREND_MONTHS = ("2023-01", "2023-02", "2023-03")
+# Half-open date_signed range covering TREND_MONTHS, compared as text so
+# idx_contracts_date can serve it
+TREND_RANGE = ("2023-01", "2023-04")
+
+# Hot-path statements. Fixed strings let the shared connection's statement
+# cache reuse the prepared statement instead of re-parsing it per request
+INSERT_CONTRACT_SQL = """
+INSERT OR REPLACE INTO contracts 
+(contract_number, description, amount, supplier, country, risk_score, risk_level)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_CHAT_SQL = """
+INSERT INTO chat_logs (user_id, message, response, language, intent)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+SELECT_USER_SQL = "SELECT name, cnic, language FROM users WHERE cnic = ?"
+
+# Bills with the total summed by SQLite in the same pass
+SELECT_BILLS_SQL = "SELECT *, SUM(amount) OVER () AS total FROM bills WHERE cnic = ?"
+SELECT_ACCOUNT_BILLS_SQL = SELECT_BILLS_SQL + " AND account = ?"
+
+# INSERT statement for each write_queue tag
+WRITE_SQL = {
+    'contract': INSERT_CONTRACT_SQL,
+    'chat': INSERT_CHAT_SQL
+}
+
+# Indexes for the dashboard aggregations and the ordered contract listing
+SERVER_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_contracts_supplier ON contracts(supplier);
+CREATE INDEX IF NOT EXISTS idx_contracts_date ON contracts(date_signed);
+CREATE INDEX IF NOT EXISTS idx_contracts_risk ON contracts(risk_level);
+CREATE INDEX IF NOT EXISTS idx_contracts_amount ON contracts(amount DESC);
+CREATE INDEX IF NOT EXISTS idx_contracts_risk_amount ON contracts(risk_level, amount DESC);
+CREATE INDEX IF NOT EXISTS idx_bills_type ON bills(bill_type);
+"""
+
+# Defaults for contract attributes the API does not collect
+DEFAULT_DURATION_MONTHS = 12
+DEFAULT_BID_COUNT = 3
+
+# Model features that do not depend on the contract amount
+FEATURE_DEFAULTS = {
+    'duration_months': DEFAULT_DURATION_MONTHS,
+    'bid_count': DEFAULT_BID_COUNT,
+    'extreme_short_duration': 1 if DEFAULT_DURATION_MONTHS <= 3 else 0,
+    'extreme_low_bids': 1 if DEFAULT_BID_COUNT <= 1 else 0,
+    'frequent_supplier_high_value': 0,  # Default to 0 for new suppliers
+    'supplier_frequency_rank': 0.2,  # Default moderate frequency
+    'dept_frequency_rank': 0.5,  # Default government department frequency
+    'supplier_risk_score': 0.3,  # Default moderate risk
+    'weekend_award': 0,  # Default to weekday
+    'end_of_year': 0,  # Default to not end of year
+    'award_year_encoded': 0  # Default encoding
+}
+
+# manual_anomaly_score without its high-value term
+MANUAL_ANOMALY_BASE = (
+    FEATURE_DEFAULTS['extreme_short_duration'] * 0.20 +
+    FEATURE_DEFAULTS['extreme_low_bids'] * 0.15 +
+    FEATURE_DEFAULTS['supplier_risk_score'] * 0.30
+)
+
+# Column positions and template row, built by prepare_feature_template
+feature_index = {}
+feature_template = np.zeros((1, 0), dtype=np.float32)
+feature_buffers = threading.local()
+
+# Micro-batching of fraud scoring: requests arriving within BATCH_WINDOW
+# seconds share a single predict_proba call of up to MAX_BATCH rows
+BATCH_WINDOW = 0.01
+MAX_BATCH = 64
+score_queue = None
+
+# Seconds a request waits for the batch scorer before using the amount heuristic
+SCORE_TIMEOUT = 5.0
+
+# Contract and chat log rows are written by a background task, flushed every
+# WRITE_INTERVAL seconds or WRITE_BATCH rows in a single transaction.
+# Queue items are (tag, row) with the tag selecting the INSERT statement
+WRITE_INTERVAL = 0.05
+WRITE_BATCH = 100
+write_queue = None
+
+# Background batch_scorer and db_writer tasks, kept referenced until shutdown
+background_tasks = []
+
+# Fraction of scored contracts written to the contracts table. Every score is
+# still counted in scored_risk_levels, which the dashboard reports unsampled
+FRAUD_LOG_SAMPLE = float(os.getenv("FRAUD_LOG_SAMPLE", "1.0"))
+scored_risk_levels = Counter()
+
+# Deletes the Arabic script block (U+0600-U+06FF) that Urdu is written in
+URDU_DELETE_TABLE = dict.fromkeys(range(0x0600, 0x0700))
+
+# Keyword intents for the fallback classifier, checked in order
+INTENT_KEYWORDS = {
+    'bill_inquiry': ['bill', 'payment', 'amount', 'بل', 'ادائیگی'],
+    'document_request': ['document', 'certificate', 'ID', 'دستاویز', 'سرٹیفکیٹ'],
+    'complaint': ['complaint', 'problem', 'issue', 'شکایت', 'مسئلہ'],
+    'fraud_report': ['fraud', 'corruption', 'bribe', 'فراڈ', 'بدعنوانی'],
+    'emergency': ['urgent', 'emergency', 'help', 'فوری', 'مدد'],
+    'information': ['information', 'office', 'hours', 'معلومات', 'دفتر'],
+    'budget': ['budget', 'expenditure', 'spending', 'بجٹ', 'اخراجات']
+}
+
+# Substring match on the lowercased message, same as `keyword.lower() in text`
+INTENT_PATTERNS = {
+    intent: re.compile("|".join(re.escape(k.lower()) for k in keywords))
+    for intent, keywords in INTENT_KEYWORDS.items()
+}
+
+def build_intent_automaton():
+    """Compile every intent keyword into one Aho-Corasick automaton, if pyahocorasick is installed"""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for priority, (intent, keywords) in enumerate(INTENT_KEYWORDS.items()):
+        for keyword in keywords:
+            # A keyword shared by several intents belongs to the first one
+            if not automaton.exists(keyword.lower()):
+                automaton.add_word(keyword.lower(), (priority, intent))
+    automaton.make_automaton()
+    return automaton
+
+INTENT_AUTOMATON = build_intent_automaton()
+
+RESPONSES = {
+    "english": {
+        "bill_inquiry": "To check your bill, please provide your CNIC and account number.",
+        "document_request": "For documents, visit the nearest government office with required papers.",
+        "complaint": "Your complaint has been noted. Please provide details for investigation.",
+        "fraud_report": "Thank you for reporting. Fraud cases are taken seriously.",
+        "emergency": "For emergencies, call 15 or visit the nearest office immediately.",
+        "information": "Government offices are open Monday-Friday, 9 AM to 5 PM.",
+        "general": "Hello! I'm your government services assistant. How can I help you?"
+    },
+    "urdu": {
+        "bill_inquiry": "اپنا بل چیک کرنے کے لیے CNIC اور اکاؤنٹ نمبر فراہم کریں۔",
+        "document_request": "دستاویزات کے لیے قریبی سرکاری دفتر جائیں۔",
+        "complaint": "آپ کی شکایت نوٹ کر لی گئی ہے۔ تفصیلات فراہم کریں۔",
+        "fraud_report": "رپورٹ کا شکریہ۔ کرپشن کے معاملات سنجیدگی سے لیے جاتے ہیں۔",
+        "emergency": "ایمرجنسی کے لیے 15 پر کال کریں۔",
+        "information": "سرکاری دفاتر پیر سے جمعہ کھلے ہیں۔",
+        "general": "السلام علیکم! میں سرکاری خدمات کا معاون ہوں۔"
+    }
+}
+
+# Flattened (language, intent) -> response lookup
+RESPONSE_MAP = {
+    (language, intent): text
+    for language, texts in RESPONSES.items()
+    for intent, text in texts.items()
+}
+
+Amount = Annotated[float, Field(gt=0, le=1e12)]
+Cnic = Annotated[str, StringConstraints(min_length=13, max_length=15)]
+
 class ContractAnalysisRequest(BaseModel):
+    # Clients also send contract_type/duration_months/is_emergency, which are ignored
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
     contract_number: str
     description: str
-    amount: float
+    amount: Amount
     supplier: str
     country: str
 
 class ChatRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid', str_strip_whitespace=True)
+    
     message: str
     user_id: Optional[str] = None
     language: Optional[str] = "english"
 
 class BillInquiryRequest(BaseModel):
-    cnic: str
+    model_config = ConfigDict(extra='forbid', str_strip_whitespace=True)
+    
+    cnic: Cnic
     account_number: Optional[str] = None
 
 class ContractResponse(BaseModel):
@@ -66,14 +316,18 @@ class ChatResponse(BaseModel):
     language: str
 
 def load_models():
-    global fraud_model, chatbot_model, feature_scaler, feature_names
+    global fraud_model, fraud_session, chatbot_model, feature_names
     
+    # Heavy ML imports are only needed once, at model load
+    import joblib
+    from sklearn.pipeline import make_pipeline
+    
+    feature_scaler = None
     logger.info("Loading GovAI models...")
     
     try:
         # Load optimized production configuration (first priority)
         if os.path.exists("models/final/latest_optimized_config.json"):
-            import json
             with open("models/final/latest_optimized_config.json") as f:
                 config = json.load(f)
             
@@ -81,23 +335,28 @@ def load_models():
             model_file = config.get('model_file')
             if model_file and os.path.exists(model_file):
                 fraud_model = joblib.load(model_file)
-                logger.info(f"Loaded OPTIMIZED {config['model_name']} (F1={config['performance']['f1_score']:.3f})")
-                logger.info(f"Performance improvement: {config['improvement_over_original']}")
+                logger.info("Loaded OPTIMIZED %s (F1=%.3f)", config['model_name'], config['performance']['f1_score'])
+                logger.info("Performance improvement: %s", config['improvement_over_original'])
+            
+            # Prefer native ONNX inference when the model has been exported (scripts/export_onnx.py)
+            onnx_file = config.get('onnx_file')
+            if ort is not None and onnx_file and os.path.exists(onnx_file):
+                fraud_session = ort.InferenceSession(onnx_file, providers=["CPUExecutionProvider"])
+                logger.info("Loaded ONNX fraud model: %s", onnx_file)
             
             # Load optimized scaler
             scaler_file = config.get('scaler_file')
             if scaler_file and os.path.exists(scaler_file):
                 feature_scaler = joblib.load(scaler_file)
-                logger.info(f"Loaded optimized scaler: {scaler_file}")
+                logger.info("Loaded optimized scaler: %s", scaler_file)
             
             # Load optimized feature names
             feature_names = config.get('features', [])
             if feature_names:
-                logger.info(f"Loaded {len(feature_names)} optimized features")
+                logger.info("Loaded %s optimized features", len(feature_names))
         
         # Fallback to previous production configuration
         elif os.path.exists("models/latest_production_config.json"):
-            import json
             with open("models/latest_production_config.json") as f:
                 config = json.load(f)
             
@@ -107,22 +366,22 @@ def load_models():
                 model_file = config['model_files'][best_model_name]
                 if os.path.exists(model_file):
                     fraud_model = joblib.load(model_file)
-                    logger.info(f"Loaded {best_model_name} fraud detection model: {model_file}")
+                    logger.info("Loaded %s fraud detection model: %s", best_model_name, model_file)
                 else:
-                    logger.error(f"Model file not found: {model_file}")
+                    logger.error("Model file not found: %s", model_file)
             
             # Load scaler
             scaler_file = config.get('scaler_file')
             if scaler_file and os.path.exists(scaler_file):
                 feature_scaler = joblib.load(scaler_file)
-                logger.info(f"Loaded feature scaler: {scaler_file}")
+                logger.info("Loaded feature scaler: %s", scaler_file)
             
             # Load feature names
             features_file = config.get('features_file')
             if features_file and os.path.exists(features_file):
                 with open(features_file) as f:
                     feature_names = json.load(f)
-                logger.info(f"Loaded {len(feature_names)} feature names")
+                logger.info("Loaded %s feature names", len(feature_names))
         
         # Fallback to old model if new ones not available
         elif os.path.exists("models/isolation_forest_model.pkl"):
@@ -131,55 +390,384 @@ def load_models():
         else:
             logger.warning("No fraud detection model found")
         
+        # Fold the scaler into the model so inference takes raw features
+        if fraud_model is not None:
+            # Batches are at most MAX_BATCH rows; walking the trees in-thread is
+            # faster than dispatching them to a joblib worker pool per call
+            if 'n_jobs' in fraud_model.get_params():
+                fraud_model.set_params(n_jobs=1)
+            if feature_scaler is not None:
+                fraud_model = make_pipeline(feature_scaler, fraud_model)
+            elif feature_names:
+                # Trained on scaled features - scoring raw ones would give wrong risks
+                logger.warning("No feature scaler found, using fallback risk calculation")
+                fraud_model = None
+            else:
+                # The legacy isolation forest scores raw features
+                fraud_model = make_pipeline(fraud_model)
+        
+        prepare_feature_template()
+        
         chatbot_model = {
-            'intents': {
-                'bill_inquiry': ['bill', 'payment', 'amount', 'بل', 'ادائیگی'],
-                'document_request': ['document', 'certificate', 'ID', 'دستاویز', 'سرٹیفکیٹ'],
-                'complaint': ['complaint', 'problem', 'issue', 'شکایت', 'مسئلہ'],
-                'fraud_report': ['fraud', 'corruption', 'bribe', 'فراڈ', 'بدعنوانی'],
-                'emergency': ['urgent', 'emergency', 'help', 'فوری', 'مدد'],
-                'information': ['information', 'office', 'hours', 'معلومات', 'دفتر'],
-                'budget': ['budget', 'expenditure', 'spending', 'بجٹ', 'اخراجات']
-            }
+            'intents': INTENT_KEYWORDS
         }
         logger.info("Chatbot model loaded with multilingual support")
         
     except Exception as e:
-        logger.error(f"Error loading models: {e}")
+        logger.error("Error loading models: %s", e)
 
 def get_db_connection():
-    if not os.path.exists(db_path):
-        raise HTTPException(status_code=500, detail="Database not found")
-    return sqlite3.connect(db_path)
+    """Return the shared connection, opening it on first use; call with db_lock held"""
+    global db_conn
+    
+    if db_conn is None:
+        if not os.path.exists(db_path):
+            raise HTTPException(status_code=500, detail="Database not found")
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                               cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        db_conn = conn
+    return db_conn
 
 def detect_language(text: str) -> str:
-    # Simple language detection
-    urdu_chars = set('آابپتٹثجچحخدڈذرڑزژسشصضطظعغفقکگلمنںوہھءیے')
-    text_chars = set(text)
-    urdu_ratio = len(text_chars.intersection(urdu_chars)) / len(text_chars) if text_chars else 0
+    # Simple language detection - share of Arabic-script codepoints in the text
+    urdu_count = len(text) - len(text.translate(URDU_DELETE_TABLE))
+    urdu_ratio = urdu_count / max(len(text), 1)
     return "urdu" if urdu_ratio > 0.3 else "english"
 
 def classify_intent(text: str) -> str:
-    # Import enhanced chatbot
-    try:
-        from enhanced_chatbot import chatbot
-        result = chatbot.get_response(text)
+    if enhanced_chatbot is not None:
+        result = enhanced_chatbot.get_response(text)
         return result.get('intent', 'general')
-    except ImportError:
-        # Fallback to original method
+    
+    # Fallback to keyword matching
+    if chatbot_model:
         text_lower = text.lower()
         
-        if chatbot_model and 'intents' in chatbot_model:
-            for intent, keywords in chatbot_model['intents'].items():
-                for keyword in keywords:
-                    if keyword.lower() in text_lower:
-                        return intent
+        # Single pass over the message; the earliest-listed matching intent wins
+        if INTENT_AUTOMATON is not None:
+            matches = [match for _, match in INTENT_AUTOMATON.iter(text_lower)]
+            return min(matches)[1] if matches else "general"
         
-        return "general"
+        for intent, pattern in INTENT_PATTERNS.items():
+            if pattern.search(text_lower):
+                return intent
+    
+    return "general"
+
+def prepare_feature_template():
+    """Map feature names to columns and prebuild the row of amount-independent features"""
+    global feature_index, feature_template
+    
+    feature_index = {name: i for i, name in enumerate(feature_names)}
+    feature_template = np.zeros((1, len(feature_names)), dtype=np.float32)
+    for name, value in FEATURE_DEFAULTS.items():
+        if name in feature_index:
+            feature_template[0, feature_index[name]] = value
+
+def build_features(amounts):
+    """Fill this thread's feature buffer with one row per contract amount"""
+    buffer = getattr(feature_buffers, 'rows', None)
+    if buffer is None or buffer.shape[1] != feature_template.shape[1]:
+        buffer = feature_buffers.rows = np.empty((MAX_BATCH, feature_template.shape[1]), dtype=np.float32)
+    features = buffer[:len(amounts)]
+    features[:] = feature_template
+    
+    amount = np.asarray(amounts, dtype=np.float64)
+    high_value = (amount > 25000000).astype(np.float64)
+    amount_features = (
+        # Basic features
+        ('contract_value', amount),
+        ('value_log', np.log1p(amount)),
+        ('value_sqrt', np.sqrt(amount)),
+        ('value_per_month', amount / DEFAULT_DURATION_MONTHS),
+        
+        # Statistical features
+        ('value_zscore', np.abs(amount - 5000000) / 2000000),  # Z-score approximation
+        ('value_percentile', np.minimum(0.99, amount / 50000000)),  # Percentile approximation
+        
+        # Ratio features (key for fraud detection)
+        ('value_duration_ratio', amount / DEFAULT_DURATION_MONTHS),
+        ('value_bid_ratio', amount / DEFAULT_BID_COUNT),
+        ('supplier_concentration', np.minimum(1.0, amount / 10000000)),  # Concentration approximation
+        
+        # Risk flags (critical for detection)
+        ('extreme_high_value', high_value),
+        ('high_value_short_duration', high_value * FEATURE_DEFAULTS['extreme_short_duration']),
+        ('manual_anomaly_score', MANUAL_ANOMALY_BASE + high_value * 0.25),
+    )
+    for name, values in amount_features:
+        i = feature_index.get(name)
+        if i is not None:
+            features[:, i] = values
+    return features
+
+def score_contracts(amounts):
+    """Run the fraud model over a batch of contract amounts, returning (risk_scores, anomaly_scores)"""
+    features = build_features(amounts)
+    
+    if fraud_session is not None:
+        # ONNX Runtime - the exported graph includes the scaler; outputs are (labels, probabilities)
+        probabilities = fraud_session.run(None, {fraud_session.get_inputs()[0].name: features})[1]
+        fraud_probability = probabilities[:, 1] if probabilities.shape[1] > 1 else probabilities[:, 0]
+        return fraud_probability, fraud_probability
+    
+    if hasattr(fraud_model, 'predict_proba'):
+        # Random Forest model - use probability prediction
+        probabilities = fraud_model.predict_proba(features)
+        fraud_probability = probabilities[:, 1] if probabilities.shape[1] > 1 else probabilities[:, 0]
+        
+        # Use more sensitive threshold for live detection (0.30)
+        return fraud_probability, fraud_probability
+    
+    # Fallback for Isolation Forest
+    anomaly_scores = fraud_model.decision_function(features)
+    risk_scores = np.clip(0.5 + (-anomaly_scores * 0.5), 0, 1)
+    return risk_scores, anomaly_scores
+
+async def drain_queue(queue, max_items, window, batch=None):
+    """Wait for one item, then collect more for up to `window` seconds or `max_items` total.
+    
+    Items are appended to `batch` if given, so a cancelled caller still holds them.
+    """
+    loop = asyncio.get_event_loop()
+    
+    if batch is None:
+        batch = []
+    batch.append(await queue.get())
+    deadline = loop.time() + window
+    while len(batch) < max_items:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+async def batch_scorer():
+    """Collect /fraud-detect requests for up to BATCH_WINDOW seconds and score them together"""
+    while True:
+        batch = await drain_queue(score_queue, MAX_BATCH, BATCH_WINDOW)
+        
+        amounts = [amount for amount, _ in batch]
+        try:
+            risk_scores, anomaly_scores = await run_in_threadpool(score_contracts, amounts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        
+        for (_, future), risk_score, anomaly_score in zip(batch, risk_scores, anomaly_scores):
+            if not future.done():
+                future.set_result((float(risk_score), float(anomaly_score)))
+
+def fallback_risk_score(amount):
+    """Amount-based risk score used when no model is loaded"""
+    return min(1.0, amount / 10000000)
+
+async def score_contract(amount):
+    """Queue one contract amount for the batch scorer and wait for its scores"""
+    future = asyncio.get_event_loop().create_future()
+    await score_queue.put((amount, future))
+    try:
+        return await asyncio.wait_for(future, SCORE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("Batch scorer did not answer within %ss, using fallback risk calculation", SCORE_TIMEOUT)
+        risk_score = fallback_risk_score(amount)
+        return risk_score, risk_score
+
+# Blocking database helpers - endpoints run these via run_in_threadpool
+
+def write_log_rows(items):
+    """Insert a batch of tagged log rows, one executemany per table, in one transaction"""
+    rows_by_sql = {}
+    for tag, row in items:
+        rows_by_sql.setdefault(WRITE_SQL[tag], []).append(row)
+    
+    with db_lock:
+        conn = get_db_connection()
+        conn.execute("BEGIN")
+        try:
+            for sql, rows in rows_by_sql.items():
+                conn.executemany(sql, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+async def flush_log_rows(items):
+    try:
+        await run_in_threadpool(write_log_rows, items)
+    except Exception as e:
+        logger.warning("Could not write %s log rows to database: %s", len(items), e)
+
+async def db_writer():
+    """Flush queued contract and chat log rows off the response path"""
+    while True:
+        batch = []
+        try:
+            await drain_queue(write_queue, WRITE_BATCH, WRITE_INTERVAL, batch)
+        except asyncio.CancelledError:
+            # Shutting down - write the rows already taken off the queue
+            if batch:
+                await flush_log_rows(batch)
+            raise
+        await flush_log_rows(batch)
+
+def fetch_bills(cnic, account_number):
+    if account_number:
+        bills_query, params = SELECT_ACCOUNT_BILLS_SQL, (cnic, account_number)
+    else:
+        bills_query, params = SELECT_BILLS_SQL, (cnic,)
+    
+    with db_lock:
+        conn = get_db_connection()
+        
+        # Get user info
+        user = conn.execute(SELECT_USER_SQL, (cnic,)).fetchone()
+        
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        rows = conn.execute(bills_query, params).fetchall()
+    
+    bills_list = [dict(row) for row in rows]
+    total_amount = bills_list[0]['total'] if bills_list else 0
+    for bill in bills_list:
+        del bill['total']
+    
+    return {
+        "user": {
+            "name": user['name'],
+            "cnic": user['cnic'],
+            "language": user['language']
+        },
+        "bills": bills_list,
+        "total_amount": float(total_amount or 0),
+        "bill_count": len(bills_list)
+    }
+
+def compute_dashboard():
+    with db_lock:
+        conn = get_db_connection()
+        
+        # Contract statistics
+        total_contracts, total_value = conn.execute(
+            "SELECT COUNT(*), SUM(amount) FROM contracts").fetchone()
+        
+        # Risk level distribution
+        risk_distribution = dict(conn.execute("""
+        SELECT risk_level, COUNT(*) FROM contracts
+        WHERE risk_level IS NOT NULL GROUP BY risk_level
+        """).fetchall())
+        
+        # Top suppliers
+        top_suppliers = dict(conn.execute("""
+        SELECT supplier, SUM(amount) AS total FROM contracts
+        WHERE supplier IS NOT NULL GROUP BY supplier ORDER BY total DESC LIMIT 10
+        """).fetchall())
+        
+        # Monthly trends
+        monthly_trends = dict.fromkeys(TREND_MONTHS, 0.0)
+        monthly_trends.update(conn.execute("""
+        SELECT substr(date_signed, 1, 7) AS month, SUM(amount) FROM contracts
+        WHERE date_signed >= ? AND date_signed < ? GROUP BY month
+        """, TREND_RANGE).fetchall())
+        
+        # Bills statistics
+        bill_count, bill_total, bill_avg = conn.execute(
+            "SELECT COUNT(*), SUM(amount), AVG(amount) FROM bills").fetchone()
+        bill_stats = {
+            "total_bills": bill_count,
+            "total_amount": float(bill_total or 0),
+            "avg_amount": float(bill_avg or 0),
+            "by_type": dict(conn.execute("""
+            SELECT bill_type, COUNT(*) FROM bills
+            WHERE bill_type IS NOT NULL GROUP BY bill_type
+            """).fetchall())
+        }
+    
+    return {
+        "contracts": {
+            "total_contracts": total_contracts,
+            "total_value": float(total_value or 0),
+            "risk_distribution": risk_distribution,
+            "top_suppliers": top_suppliers,
+            "monthly_trends": {m: float(v or 0) for m, v in monthly_trends.items()},
+            "scored_risk_distribution": dict(scored_risk_levels)
+        },
+        "bills": bill_stats,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def fetch_contracts(limit, risk_level, cursor_amount, cursor_id):
+    conditions = []
+    params = []
+    
+    if risk_level:
+        conditions.append("risk_level = ?")
+        params.append(risk_level)
+    
+    # Keyset pagination on (amount, id): continue after the last row of the
+    # previous page, so rows sharing its amount are not skipped
+    if cursor_amount is not None and cursor_id is not None:
+        conditions.append("(amount < ? OR (amount = ? AND id > ?))")
+        params.extend([cursor_amount, cursor_amount, cursor_id])
+    
+    query = "SELECT * FROM contracts"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY amount DESC, id ASC LIMIT ?"
+    params.append(limit)
+    
+    with db_lock:
+        contracts = [dict(row) for row in get_db_connection().execute(query, params)]
+    
+    return {
+        "contracts": contracts,
+        "count": len(contracts),
+        "next_cursor": [contracts[-1]['amount'], contracts[-1]['id']] if len(contracts) == limit else None
+    }
+
+def ensure_indexes():
+    """Create the indexes the dashboard and contract listing rely on"""
+    try:
+        with db_lock:
+            get_db_connection().executescript(SERVER_INDEXES)
+    except (sqlite3.Error, HTTPException) as e:
+        logger.warning("Could not create indexes: %s", e)
 
 @app.on_event("startup")
 async def startup_event():
+    global score_queue, write_queue
+    
     load_models()
+    ensure_indexes()
+    
+    score_queue = asyncio.Queue()
+    write_queue = asyncio.Queue()
+    # The event loop only holds weak references to tasks
+    background_tasks[:] = [asyncio.create_task(batch_scorer()), asyncio.create_task(db_writer())]
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop the background tasks; db_writer flushes the batch it holds first
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    
+    # Flush log rows still waiting in the queue
+    items = []
+    while not write_queue.empty():
+        items.append(write_queue.get_nowait())
+    if items:
+        await flush_log_rows(items)
 
 @app.get("/")
 async def root():
@@ -209,95 +797,16 @@ async def health_check():
 
 @app.post("/fraud-detect", response_model=ContractResponse)
 async def detect_fraud(contract: ContractAnalysisRequest):
-    logger.info(f"Analyzing contract: {contract.contract_number}")
+    request_logger.info("Analyzing contract: %s", contract.contract_number)
     
     try:
-        if fraud_model is None or feature_scaler is None or not feature_names:
+        if fraud_model is None or not feature_names:
             # Fallback risk calculation
-            risk_score = min(1.0, contract.amount / 10000000)
+            risk_score = fallback_risk_score(contract.amount)
             anomaly_score = risk_score
         else:
-            # Create enhanced features for optimized model
-            duration_months = 12  # Default duration
-            bid_count = 3  # Default bid count
-            
-            # Calculate advanced features matching the optimized model
-            import math
-            
-            features_dict = {
-                # Basic features
-                'contract_value': contract.amount,
-                'value_log': math.log1p(contract.amount),
-                'value_sqrt': math.sqrt(contract.amount),
-                'duration_months': duration_months,
-                'bid_count': bid_count,
-                'value_per_month': contract.amount / duration_months,
-                
-                # Statistical features
-                'value_zscore': abs(contract.amount - 5000000) / 2000000,  # Z-score approximation
-                'value_percentile': min(0.99, contract.amount / 50000000),  # Percentile approximation
-                
-                # Ratio features (key for fraud detection)
-                'value_duration_ratio': contract.amount / duration_months,
-                'value_bid_ratio': contract.amount / bid_count,
-                'supplier_concentration': min(1.0, contract.amount / 10000000),  # Concentration approximation
-                
-                # Risk flags (critical for detection)
-                'extreme_high_value': 1 if contract.amount > 25000000 else 0,
-                'extreme_short_duration': 1 if duration_months <= 3 else 0,
-                'extreme_low_bids': 1 if bid_count <= 1 else 0,
-                
-                # Interaction features
-                'high_value_short_duration': (1 if contract.amount > 25000000 else 0) * (1 if duration_months <= 3 else 0),
-                'frequent_supplier_high_value': 0,  # Default to 0 for new suppliers
-                
-                # Ranking features
-                'supplier_frequency_rank': 0.2,  # Default moderate frequency
-                'dept_frequency_rank': 0.5,  # Default government department frequency
-                
-                # Risk scores
-                'supplier_risk_score': 0.3,  # Default moderate risk
-                'manual_anomaly_score': (
-                    (1 if contract.amount > 25000000 else 0) * 0.25 +
-                    (1 if duration_months <= 3 else 0) * 0.20 +
-                    (1 if bid_count <= 1 else 0) * 0.15 +
-                    0.3 * 0.30  # supplier risk component
-                ),
-                
-                # Time features
-                'weekend_award': 0,  # Default to weekday
-                'end_of_year': 0,  # Default to not end of year
-                'award_year_encoded': 0  # Default encoding
-            }
-            
-            # Create feature array in correct order
-            features = []
-            for feature_name in feature_names:
-                if feature_name in features_dict:
-                    features.append(features_dict[feature_name])
-                else:
-                    features.append(0.0)  # Default value for missing features
-            
-            features = np.array([features])
-            
-            # Use the optimized model
-            if hasattr(fraud_model, 'predict_proba'):
-                # Random Forest model - use probability prediction
-                features_scaled = feature_scaler.transform(features)
-                probabilities = fraud_model.predict_proba(features_scaled)[0]
-                fraud_probability = probabilities[1] if len(probabilities) > 1 else probabilities[0]
-                
-                # Use more sensitive threshold for live detection (0.30)
-                prediction = 1 if fraud_probability >= 0.30 else 0
-                anomaly_score = fraud_probability
-                risk_score = fraud_probability
-                
-            else:
-                # Fallback for Isolation Forest
-                features_scaled = feature_scaler.transform(features)
-                prediction = fraud_model.predict(features_scaled)[0]
-                anomaly_score = fraud_model.decision_function(features_scaled)[0]
-                risk_score = max(0, min(1, 0.5 + (-anomaly_score * 0.5)))
+            # Scored together with concurrent requests by batch_scorer
+            risk_score, anomaly_score = await score_contract(contract.amount)
         
         # Determine risk level
         if risk_score > 0.8:
@@ -313,35 +822,26 @@ async def detect_fraud(contract: ContractAnalysisRequest):
             risk_level = "LOW"
             recommendation = "Contract appears normal."
         
-        # Log to database
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-            INSERT OR REPLACE INTO contracts 
-            (contract_number, description, amount, supplier, country, risk_score, risk_level)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (contract.contract_number, contract.description, contract.amount, 
-                   contract.supplier, contract.country, risk_score, risk_level))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.warning(f"Could not log to database: {e}")
+        # Log to database - sampled, and written in the background by db_writer
+        scored_risk_levels[risk_level] += 1
+        if FRAUD_LOG_SAMPLE >= 1 or random.random() < FRAUD_LOG_SAMPLE:
+            write_queue.put_nowait(('contract', (contract.contract_number, contract.description, contract.amount,
+                                                 contract.supplier, contract.country, risk_score, risk_level)))
         
         return ContractResponse(
             risk_level=risk_level,
             risk_score=round(risk_score, 3),
-            anomaly_score=round(float(anomaly_score), 3),
+            anomaly_score=round(anomaly_score, 3),
             recommendation=recommendation
         )
         
     except Exception as e:
-        logger.error(f"Error in fraud detection: {e}")
+        logger.error("Error in fraud detection: %s", e)
         raise HTTPException(status_code=500, detail=f"Fraud detection failed: {str(e)}")
 
 @app.post("/assistant", response_model=ChatResponse)
 async def citizen_assistant(chat: ChatRequest):
-    logger.info(f"Chat request: {chat.message[:50]}...")
+    request_logger.info("Chat request: %.50s...", chat.message)
     
     try:
         # Detect language
@@ -353,41 +853,10 @@ async def citizen_assistant(chat: ChatRequest):
         intent = classify_intent(chat.message)
         
         # Generate response
-        responses = {
-            "english": {
-                "bill_inquiry": "To check your bill, please provide your CNIC and account number.",
-                "document_request": "For documents, visit the nearest government office with required papers.",
-                "complaint": "Your complaint has been noted. Please provide details for investigation.",
-                "fraud_report": "Thank you for reporting. Fraud cases are taken seriously.",
-                "emergency": "For emergencies, call 15 or visit the nearest office immediately.",
-                "information": "Government offices are open Monday-Friday, 9 AM to 5 PM.",
-                "general": "Hello! I'm your government services assistant. How can I help you?"
-            },
-            "urdu": {
-                "bill_inquiry": "اپنا بل چیک کرنے کے لیے CNIC اور اکاؤنٹ نمبر فراہم کریں۔",
-                "document_request": "دستاویزات کے لیے قریبی سرکاری دفتر جائیں۔",
-                "complaint": "آپ کی شکایت نوٹ کر لی گئی ہے۔ تفصیلات فراہم کریں۔",
-                "fraud_report": "رپورٹ کا شکریہ۔ کرپشن کے معاملات سنجیدگی سے لیے جاتے ہیں۔",
-                "emergency": "ایمرجنسی کے لیے 15 پر کال کریں۔",
-                "information": "سرکاری دفاتر پیر سے جمعہ کھلے ہیں۔",
-                "general": "السلام علیکم! میں سرکاری خدمات کا معاون ہوں۔"
-            }
-        }
-        
-        response_text = responses[language].get(intent, responses[language]["general"])
+        response_text = RESPONSE_MAP.get((language, intent)) or RESPONSE_MAP[(language, "general")]
         
-        # Log chat
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-            INSERT INTO chat_logs (user_id, message, response, language, intent)
-            VALUES (?, ?, ?, ?, ?)
-            """, (chat.user_id, chat.message, response_text, language, intent))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.warning(f"Could not log chat: {e}")
+        # Log chat - written in the background by db_writer
+        write_queue.put_nowait(('chat', (chat.user_id, chat.message, response_text, language, intent)))
         
         return ChatResponse(
             response=response_text,
@@ -396,131 +865,48 @@ async def citizen_assistant(chat: ChatRequest):
         )
         
     except Exception as e:
-        logger.error(f"Error in chatbot: {e}")
+        logger.error("Error in chatbot: %s", e)
         raise HTTPException(status_code=500, detail=f"Assistant failed: {str(e)}")
 
 @app.post("/bill-inquiry")
 async def bill_inquiry(request: BillInquiryRequest):
-    logger.info(f"Bill inquiry for CNIC: {request.cnic}")
+    request_logger.info("Bill inquiry for CNIC: %s", request.cnic)
     
     try:
-        conn = get_db_connection()
-        
-        # Get user info
-        user_df = pd.read_sql_query("""
-        SELECT * FROM users WHERE cnic = ?
-        """, conn, params=(request.cnic,))
-        
-        if user_df.empty:
-            conn.close()
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        user = user_df.iloc[0]
-        
-        # Get bills
-        bills_query = """
-        SELECT * FROM bills WHERE cnic = ?
-        """
-        params = [request.cnic]
-        
-        if request.account_number:
-            bills_query += " AND account = ?"
-            params.append(request.account_number)
-        
-        bills_df = pd.read_sql_query(bills_query, conn, params=tuple(params))
-        conn.close()
-        
-        bills_list = bills_df.to_dict('records') if not bills_df.empty else []
-        
-        return {
-            "user": {
-                "name": user['name'],
-                "cnic": user['cnic'],
-                "language": user['language']
-            },
-            "bills": bills_list,
-            "total_amount": float(bills_df['amount'].sum()) if not bills_df.empty else 0,
-            "bill_count": len(bills_list)
-        }
+        key = (request.cnic, request.account_number)
+        bills = bill_cache.get(key)
+        if bills is None:
+            bills = await run_in_threadpool(fetch_bills, request.cnic, request.account_number)
+            bill_cache.set(key, bills)
+        return bills
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in bill inquiry: {e}")
+        logger.error("Error in bill inquiry: %s", e)
         raise HTTPException(status_code=500, detail=f"Bill inquiry failed: {str(e)}")
 
 @app.get("/analytics/dashboard")
-async def analytics_dashboard():
+async def analytics_dashboard(fresh: bool = False):
     try:
-        conn = get_db_connection()
-        
-        # Contract statistics
-        contracts_df = pd.read_sql_query("SELECT * FROM contracts", conn)
-        
-        # Risk level distribution
-        risk_distribution = contracts_df['risk_level'].value_counts().to_dict()
-        
-        # Top suppliers
-        top_suppliers = contracts_df.groupby('supplier')['amount'].sum().nlargest(10).to_dict()
-        
-        # Monthly trends
-        monthly_trends = {
-            "2023-01": float(contracts_df[contracts_df['date_signed'].str.contains('2023-01', na=False)]['amount'].sum()),
-            "2023-02": float(contracts_df[contracts_df['date_signed'].str.contains('2023-02', na=False)]['amount'].sum()),
-            "2023-03": float(contracts_df[contracts_df['date_signed'].str.contains('2023-03', na=False)]['amount'].sum())
-        }
-        
-        # Bills statistics
-        bills_df = pd.read_sql_query("SELECT * FROM bills", conn)
-        bill_stats = {
-            "total_bills": len(bills_df),
-            "total_amount": float(bills_df['amount'].sum()),
-            "avg_amount": float(bills_df['amount'].mean()),
-            "by_type": bills_df['bill_type'].value_counts().to_dict()
-        }
-        
-        conn.close()
-        
-        return {
-            "contracts": {
-                "total_contracts": len(contracts_df),
-                "total_value": float(contracts_df['amount'].sum()),
-                "risk_distribution": risk_distribution,
-                "top_suppliers": top_suppliers,
-                "monthly_trends": monthly_trends
-            },
-            "bills": bill_stats,
-            "timestamp": datetime.now().isoformat()
-        }
+        dashboard = None if fresh else dashboard_cache.get("dashboard")
+        if dashboard is None:
+            dashboard = await run_in_threadpool(compute_dashboard)
+            dashboard_cache.set("dashboard", dashboard)
+        return dashboard
         
     except Exception as e:
-        logger.error(f"Error in analytics: {e}")
+        logger.error("Error in analytics: %s", e)
         raise HTTPException(status_code=500, detail=f"Analytics failed: {str(e)}")
 
 @app.get("/contracts")
-async def get_contracts(limit: int = 100, risk_level: Optional[str] = None):
+async def get_contracts(limit: int = Query(100, ge=1, le=1000), risk_level: Optional[str] = None,
+                        cursor_amount: Optional[float] = None, cursor_id: Optional[int] = None):
     try:
-        conn = get_db_connection()
-        
-        query = "SELECT * FROM contracts"
-        params = []
-        
-        if risk_level:
-            query += " WHERE risk_level = ?"
-            params.append(risk_level)
-        
-        query += f" ORDER BY amount DESC LIMIT {limit}"
-        
-        contracts_df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        
-        return {
-            "contracts": contracts_df.to_dict('records'),
-            "count": len(contracts_df)
-        }
+        return await run_in_threadpool(fetch_contracts, limit, risk_level, cursor_amount, cursor_id)
         
     except Exception as e:
-        logger.error(f"Error getting contracts: {e}")
+        logger.error("Error getting contracts: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get contracts: {str(e)}")
 
 if __name__ == "__main__":
@@ -1,198 +1,352 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import requests
-import json
-import time
-import sqlite3
-import os
+import random
 import re
-from typing import Dict, List, Any, Optional
-import logging
+from collections import deque
+
+# Patterns for CNICs and bill IDs in chat messages, compiled once at import
+CNIC_RE = re.compile(r'\d{5}[-\s]?\d{7}[-\s]?\d')
+BILL_ID_RE = re.compile(r'(?:\d{5}[-\s]?\d{7}[-\s]?\d)|(?:BILL-\d+)|(?:[A-Z]+-\d+)', re.IGNORECASE)
+
+# Chat intents in priority order - the first matching intent answers
+CHAT_INTENT_KEYWORDS = (
+    ('cnic', frozenset({'cnic', 'verify', 'verification', 'id card', 'identity'})),
+    ('bill', frozenset({'bill', 'payment', 'pay', 'invoice', 'amount', 'due'})),
+    ('faq', frozenset({'faq', 'help', 'question', 'how to', 'what is', 'guide'})),
+    ('complaint', frozenset({'complaint', 'problem', 'issue', 'error', 'wrong'})),
+    ('emergency', frozenset({'emergency', 'urgent', 'immediate', 'asap'})),
+    ('greeting', frozenset({'hello', 'hi', 'salam', 'hey', 'assalam'})),
+)
+
+# Messages made only of these words are answered with the greeting directly
+GREETING_WORDS = dict(CHAT_INTENT_KEYWORDS)['greeting']
+GREETING_PUNCTUATION = str.maketrans('', '', '!.,?')
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def build_intent_automaton():
+    """Compile all intent keywords into one Aho-Corasick automaton, if pyahocorasick is installed"""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for intent, keywords in CHAT_INTENT_KEYWORDS:
+        for keyword in keywords:
+            automaton.add_word(keyword, intent)
+    automaton.make_automaton()
+    return automaton
+
+@st.cache_resource
+def intent_matchers():
+    """Build the intent matchers once per process instead of on every rerun"""
+    # Fallback matcher: one compiled alternation per intent, so each intent is a
+    # single C-level scan of the message instead of a Python loop over keywords
+    patterns = tuple(
+        (intent, re.compile('|'.join(map(re.escape, sorted(keywords)))))
+        for intent, keywords in CHAT_INTENT_KEYWORDS
+    )
+    return build_intent_automaton(), patterns
+
+def match_intents(user_input_lower):
+    """Return the set of intents whose keywords appear in the lowercased message"""
+    automaton, patterns = intent_matchers()
+    if automaton is not None:
+        # Single scan of the message for every keyword
+        return {intent for _, intent in automaton.iter(user_input_lower)}
+    return {intent for intent, pattern in patterns
+            if pattern.search(user_input_lower)}
 
 # Advanced Chatbot Response System
+
+# Deletes the dashes and spaces allowed in a CNIC
+CNIC_STRIP = str.maketrans('', '', '- ')
+# Full CNIC (XXXXX-XXXXXXX-X, dashes/spaces optional) with its digit groups
+CNIC_FULL = re.compile(r'\s*(\d{5})[-\s]?(\d{7})[-\s]?(\d)\s*')
+
+# Simulated CNIC registry
+VALID_CNICS = {
+    '3520212345671': {'name': 'Ahmed Khan', 'status': 'Active'},
+    '4210198765432': {'name': 'Sara Ali', 'status': 'Active'},
+    '3310156789012': {'name': 'Hassan Raza', 'status': 'Active'}
+}
+
+# Simulated bill database, keyed by the cleaned, uppercased ID so a lookup
+# is a single hash probe
+BILLS = {
+    '3520212345671': {
+        'type': 'Electricity',
+        'amount': 'PKR 3,450',
+        'due_date': '15 Oct 2025',
+        'status': 'Pending',
+        'account': 'ELEC-2023-1234'
+    },
+    '4210198765432': {
+        'type': 'Gas',
+        'amount': 'PKR 2,120',
+        'due_date': '20 Oct 2025',
+        'status': 'Pending',
+        'account': 'GAS-2023-5678'
+    },
+    'BILL123456': {
+        'type': 'Water',
+        'amount': 'PKR 890',
+        'due_date': '10 Oct 2025',
+        'status': 'Overdue',
+        'account': 'WATER-2023-9012'
+    }
+}
+
 def verify_cnic(cnic):
     """Verify CNIC format and check validity"""
-    # Remove dashes and spaces
-    cnic_clean = cnic.replace('-', '').replace(' ', '')
-    
-    # Check if 13 digits
-    if len(cnic_clean) != 13 or not cnic_clean.isdigit():
+    # Validate the format and pull out the digits in one pass
+    match = CNIC_FULL.fullmatch(cnic)
+    if not match:
         return False, "Invalid CNIC format. Please use format: XXXXX-XXXXXXX-X"
+    cnic_clean = ''.join(match.groups())
     
     # Simulate database check
-    valid_cnics = {
-        '3520212345671': {'name': 'Ahmed Khan', 'status': 'Active'},
-        '4210198765432': {'name': 'Sara Ali', 'status': 'Active'},
-        '3310156789012': {'name': 'Hassan Raza', 'status': 'Active'}
-    }
-    
-    if cnic_clean in valid_cnics:
-        return True, valid_cnics[cnic_clean]
+    if cnic_clean in VALID_CNICS:
+        return True, VALID_CNICS[cnic_clean]
     else:
         # For demo, accept any valid format
         return True, {'name': 'Verified User', 'status': 'Active'}
 
+def default_bill(cnic_or_id):
+    """Sample bill for IDs that are not in the database"""
+    return {
+        'type': 'Utility',
+        'amount': 'PKR 1,500',
+        'due_date': '30 Oct 2025',
+        'status': 'Pending',
+        'account': 'ACC-' + cnic_or_id[:8]
+    }
+
 def get_bill_info(cnic_or_id):
     """Retrieve bill information"""
-    # Simulate bill database
-    bills = {
-        '3520212345671': {
-            'type': 'Electricity',
-            'amount': 'PKR 3,450',
-            'due_date': '15 Oct 2025',
-            'status': 'Pending',
-            'account': 'ELEC-2023-1234'
-        },
-        '4210198765432': {
-            'type': 'Gas',
-            'amount': 'PKR 2,120',
-            'due_date': '20 Oct 2025',
-            'status': 'Pending',
-            'account': 'GAS-2023-5678'
-        },
-        'BILL-123456': {
-            'type': 'Water',
-            'amount': 'PKR 890',
-            'due_date': '10 Oct 2025',
-            'status': 'Overdue',
-            'account': 'WATER-2023-9012'
-        }
-    }
-    
-    cnic_clean = cnic_or_id.replace('-', '').replace(' ', '')
-    if cnic_clean in bills:
-        return bills[cnic_clean]
-    elif cnic_or_id.upper() in bills:
-        return bills[cnic_or_id.upper()]
-    else:
-        # Generate sample bill
-        return {
-            'type': 'Utility',
-            'amount': 'PKR 1,500',
-            'due_date': '30 Oct 2025',
-            'status': 'Pending',
-            'account': 'ACC-' + cnic_or_id[:8]
-        }
+    return BILLS.get(cnic_or_id.translate(CNIC_STRIP).upper()) or default_bill(cnic_or_id)
+
+# FAQ entries per category
+FAQS = {
+    'bill': (
+        "Q: How to check my bill?\nA: Provide your CNIC or Bill ID, and I'll retrieve your bill details instantly.",
+        "Q: How to pay my bill?\nA: You can pay online through our portal, mobile app, or visit authorized bank branches.",
+        "Q: What if I lost my bill?\nA: No worries! Just provide your CNIC and I'll retrieve your bill information.",
+        "Q: Can I get a bill extension?\nA: Yes, contact our helpline at 042-111-222-333 for payment extension requests."
+    ),
+    'cnic': (
+        "Q: How to verify my CNIC?\nA: Simply type your CNIC in format XXXXX-XXXXXXX-X and I'll verify it for you.",
+        "Q: What if my CNIC is expired?\nA: Visit the nearest NADRA office with required documents to renew your CNIC.",
+        "Q: Can I update CNIC details online?\nA: Some updates can be done online at nadra.gov.pk, others require office visit.",
+        "Q: How long does CNIC verification take?\nA: Instant verification online. Physical CNIC renewal takes 3-7 working days."
+    ),
+    'general': (
+        "Q: What services do you offer?\nA: Bill checking, CNIC verification, fraud detection, government services, and 24/7 assistance.",
+        "Q: Is this service free?\nA: Yes, all our online services are completely free for citizens.",
+        "Q: How secure is my data?\nA: We use bank-level encryption and never store your personal information.",
+        "Q: Available in which languages?\nA: Currently English and Urdu, more languages coming soon!"
+    )
+}
+
+# Each category's FAQs pre-joined into the text the chatbot shows
+FAQ_TEXT = {category: '\n\n'.join(entries) for category, entries in FAQS.items()}
 
 def get_faqs(category='general'):
-    """Get FAQs based on category"""
-    faqs = {
-        'bill': [
-            "Q: How to check my bill?\nA: Provide your CNIC or Bill ID, and I'll retrieve your bill details instantly.",
-            "Q: How to pay my bill?\nA: You can pay online through our portal, mobile app, or visit authorized bank branches.",
-            "Q: What if I lost my bill?\nA: No worries! Just provide your CNIC and I'll retrieve your bill information.",
-            "Q: Can I get a bill extension?\nA: Yes, contact our helpline at 042-111-222-333 for payment extension requests."
-        ],
-        'cnic': [
-            "Q: How to verify my CNIC?\nA: Simply type your CNIC in format XXXXX-XXXXXXX-X and I'll verify it for you.",
-            "Q: What if my CNIC is expired?\nA: Visit the nearest NADRA office with required documents to renew your CNIC.",
-            "Q: Can I update CNIC details online?\nA: Some updates can be done online at nadra.gov.pk, others require office visit.",
-            "Q: How long does CNIC verification take?\nA: Instant verification online. Physical CNIC renewal takes 3-7 working days."
-        ],
-        'general': [
-            "Q: What services do you offer?\nA: Bill checking, CNIC verification, fraud detection, government services, and 24/7 assistance.",
-            "Q: Is this service free?\nA: Yes, all our online services are completely free for citizens.",
-            "Q: How secure is my data?\nA: We use bank-level encryption and never store your personal information.",
-            "Q: Available in which languages?\nA: Currently English and Urdu, more languages coming soon!"
-        ]
-    }
-    return faqs.get(category, faqs['general'])
+    """Get the FAQ text for a category"""
+    return FAQ_TEXT.get(category, FAQ_TEXT['general'])
+
+# Reply templates keyed by (reply, language); fields are filled with str.format_map
+TEMPLATES = {
+    ('cnic_verified', 'English'): "✅ CNIC Verified Successfully!\n\nName: {name}\nStatus: {status}\n\nYour CNIC is valid and active. Would you like to check your bills?",
+    ('cnic_verified', 'اردو'): "✅ CNIC تصدیق شدہ!\n\nنام: {name}\nحیثیت: {status}\n\nآپ کا CNIC درست ہے۔ کیا آپ بل چیک کرنا چاہتے ہیں؟",
+    ('bill_details', 'English'): "{status_emoji} Bill Details Retrieved\n\nType: {type}\nAmount: {amount}\nDue Date: {due_date}\nStatus: {status}\nAccount: {account}\n\n💳 Pay Online: govai.portal/pay\n🏦 Or visit any authorized bank",
+    ('bill_details', 'اردو'): "{status_emoji} بل کی تفصیلات\n\nقسم: {type}\nرقم: {amount}\nآخری تاریخ: {due_date}\nحیثیت: {status}\nاکاؤنٹ: {account}\n\nآن لائن ادائیگی: govai.portal/pay",
+    ('cnic_prompt', 'English'): "Please provide your CNIC number in this format: XXXXX-XXXXXXX-X\n\nExample: 35202-1234567-1",
+    ('cnic_prompt', 'اردو'): "برائے مہربانی اپنا CNIC نمبر اس فارمیٹ میں درج کریں: XXXXX-XXXXXXX-X\n\nمثال: 35202-1234567-1",
+    ('bill_prompt', 'English'): "To check your bill, please provide:\n1. Your CNIC number (XXXXX-XXXXXXX-X)\n2. Or Bill ID (BILL-XXXXXX)\n\nExample: 'Check bill for 35202-1234567-1'",
+    ('bill_prompt', 'اردو'): "بل چیک کرنے کے لیے:\n1. اپنا CNIC نمبر درج کریں\n2. یا بل نمبر (BILL-XXXXXX)\n\nمثال: 'میرا بل چیک کریں 35202-1234567-1'",
+    ('faq', 'English'): "📚 Frequently Asked Questions ({category_title})\n\n{faq_text}\n\nAsk me anything else!",
+    ('faq', 'اردو'): "📚 اکثر پوچھے گئے سوالات ({category})\n\n{faq_text}\n\nمزید مدد کے لیے پوچھیں!",
+    ('complaint', 'English'): "📝 File a Complaint\n\nPlease provide:\n1. Nature of problem\n2. Your CNIC\n3. Contact number\n\nOur team will respond within 24 hours.\n\n🆘 Urgent Help: 111-GOVAI-HELP",
+    ('complaint', 'اردو'): "📝 شکایت درج کرنا\n\nبرائے مہربانی تفصیل دیں:\n1. مسئلے کی نوعیت\n2. آپ کا CNIC\n3. رابطہ نمبر\n\nہماری ٹیم 24 گھنٹے میں جواب دے گی۔\n\nفوری مدد: 111-GOVAI-HELP",
+    ('emergency', 'English'): "🚨 Emergency Contacts\n\n• Police: 15\n• Ambulance: 1122\n• Fire Brigade: 16\n• Citizen Helpline: 1334\n\n📍 Nearest Office: maps.govai.pk/offices",
+    ('emergency', 'اردو'): "🚨 ایمرجنسی رابطے\n\n• پولیس: 15\n• ایمبولینس: 1122\n• فائر بریگیڈ: 16\n• شہری ہیلپ لائن: 1334\n\nقریبی دفتر: maps.govai.pk/offices",
+    ('greeting', 'English'): "Hello! 👋 Welcome to GovAI Assistant!\n\nI can help you with:\n\n✅ Check Bills (Electricity, Gas, Water)\n✅ CNIC Verification\n✅ File Complaints\n✅ FAQs & Guides\n✅ Emergency Services\n\nJust type your question!",
+    ('greeting', 'اردو'): "السلام علیکم! 👋\n\nGovAI میں خوش آمدید!\n\nمیں آپ کی مدد کیسے کر سکتا ہوں؟\n\n✅ بل چیک کریں\n✅ CNIC تصدیق\n✅ شکایت درج کریں\n✅ FAQs دیکھیں\n\nبس اپنا سوال ٹائپ کریں!",
+    ('default', 'English'): "I'm here to help! 😊\n\nTry asking:\n\n💡 'Check my bill'\n💡 'Verify my CNIC'\n💡 'Show FAQs'\n💡 'File a complaint'\n💡 'Emergency contacts'\n\nOr ask any question directly!",
+    ('default', 'اردو'): "میں یہاں مدد کے لیے ہوں! 😊\n\nآپ یہ کر سکتے ہیں:\n\n💡 'میرا بل چیک کریں'\n💡 'CNIC تصدیق کریں'\n💡 'FAQs دیکھیں'\n💡 'شکایت درج کریں'\n\nیا اپنا سوال براہ راست پوچھیں!",
+}
 
 def get_chatbot_response(user_input, language='English'):
     """Advanced chatbot response with multiple intents"""
     user_input_lower = user_input.lower()
+    language = 'اردو' if language == 'اردو' else 'English'
     
-    # CNIC Verification Intent
-    if any(word in user_input_lower for word in ['cnic', 'verify', 'verification', 'id card', 'identity']):
+    # Plain greetings ("hi", "Hello!") match no other intent, so skip the keyword scan
+    words = user_input_lower.translate(GREETING_PUNCTUATION).split()
+    if words and GREETING_WORDS.issuperset(words):
+        return TEMPLATES[('greeting', language)]
+    
+    intents = match_intents(user_input_lower)
+    
+    # CNIC Verification Intent - replies carry the user's CNIC, so they are never cached
+    if 'cnic' in intents:
         # Check if CNIC number is in input
-        cnic_pattern = r'\d{5}[-\s]?\d{7}[-\s]?\d'
-        cnic_match = re.search(cnic_pattern, user_input)
+        cnic_match = CNIC_RE.search(user_input)
         
         if cnic_match:
             cnic = cnic_match.group()
             is_valid, result = verify_cnic(cnic)
             if is_valid and isinstance(result, dict):
-                if language == 'اردو':
-                    return f"✅ CNIC تصدیق شدہ!\n\nنام: {result['name']}\nحیثیت: {result['status']}\n\nآپ کا CNIC درست ہے۔ کیا آپ بل چیک کرنا چاہتے ہیں؟"
-                else:
-                    return f"✅ CNIC Verified Successfully!\n\nName: {result['name']}\nStatus: {result['status']}\n\nYour CNIC is valid and active. Would you like to check your bills?"
+                return TEMPLATES[('cnic_verified', language)].format_map(result)
             else:
                 return result  # Error message
-        else:
-            if language == 'اردو':
-                return "برائے مہربانی اپنا CNIC نمبر اس فارمیٹ میں درج کریں: XXXXX-XXXXXXX-X\n\nمثال: 35202-1234567-1"
-            else:
-                return "Please provide your CNIC number in this format: XXXXX-XXXXXXX-X\n\nExample: 35202-1234567-1"
     
-    # Bill Checking Intent
-    elif any(word in user_input_lower for word in ['bill', 'payment', 'pay', 'invoice', 'amount', 'due']):
+    # Bill Checking Intent - same for bill lookups
+    elif 'bill' in intents:
         # Check for CNIC or Bill ID
-        id_pattern = r'(?:\d{5}[-\s]?\d{7}[-\s]?\d)|(?:BILL-\d+)|(?:[A-Z]+-\d+)'
-        id_match = re.search(id_pattern, user_input, re.IGNORECASE)
+        id_match = BILL_ID_RE.search(user_input)
         
         if id_match:
             bill_id = id_match.group()
             bill_info = get_bill_info(bill_id)
             
             status_emoji = "⚠️" if bill_info['status'] == 'Overdue' else "✅"
-            
-            if language == 'اردو':
-                return f"{status_emoji} بل کی تفصیلات\n\nقسم: {bill_info['type']}\nرقم: {bill_info['amount']}\nآخری تاریخ: {bill_info['due_date']}\nحیثیت: {bill_info['status']}\nاکاؤنٹ: {bill_info['account']}\n\nآن لائن ادائیگی: govai.portal/pay"
-            else:
-                return f"{status_emoji} Bill Details Retrieved\n\nType: {bill_info['type']}\nAmount: {bill_info['amount']}\nDue Date: {bill_info['due_date']}\nStatus: {bill_info['status']}\nAccount: {bill_info['account']}\n\n💳 Pay Online: govai.portal/pay\n🏦 Or visit any authorized bank"
-        else:
-            if language == 'اردو':
-                return "بل چیک کرنے کے لیے:\n1. اپنا CNIC نمبر درج کریں\n2. یا بل نمبر (BILL-XXXXXX)\n\nمثال: 'میرا بل چیک کریں 35202-1234567-1'"
-            else:
-                return "To check your bill, please provide:\n1. Your CNIC number (XXXXX-XXXXXXX-X)\n2. Or Bill ID (BILL-XXXXXX)\n\nExample: 'Check bill for 35202-1234567-1'"
+            return TEMPLATES[('bill_details', language)].format(status_emoji=status_emoji, **bill_info)
+    
+    # Messages carrying a CNIC or bill ID (even without a keyword) must never
+    # land in the process-wide cache shared by every session
+    if CNIC_RE.search(user_input) or BILL_ID_RE.search(user_input):
+        return intent_response(user_input_lower.strip(), language)
+    return cached_response(user_input_lower.strip(), language)
+
+# st.cache_data outlives reruns and is shared by every session, unlike a
+# module-level lru_cache that is rebuilt each time Streamlit re-executes the script
+@st.cache_data(max_entries=512, ttl=3600, show_spinner=False)
+def cached_response(user_input_lower, language):
+    """Cached intent_response for messages without personal identifiers"""
+    return intent_response(user_input_lower, language)
+
+def intent_response(user_input_lower, language):
+    """Replies that depend only on the lowercased message and language"""
+    intents = match_intents(user_input_lower)
+    
+    # CNIC Verification Intent without a CNIC in the message
+    if 'cnic' in intents:
+        return TEMPLATES[('cnic_prompt', language)]
+    
+    # Bill Checking Intent without a CNIC or Bill ID
+    elif 'bill' in intents:
+        return TEMPLATES[('bill_prompt', language)]
     
     # FAQ Intent
-    elif any(word in user_input_lower for word in ['faq', 'help', 'question', 'how to', 'what is', 'guide']):
+    elif 'faq' in intents:
         category = 'general'
         if 'bill' in user_input_lower or 'payment' in user_input_lower:
             category = 'bill'
         elif 'cnic' in user_input_lower or 'verify' in user_input_lower:
             category = 'cnic'
         
-        faqs = get_faqs(category)
-        faq_text = '\n\n'.join(faqs)
-        
-        if language == 'اردو':
-            return f"📚 اکثر پوچھے گئے سوالات ({category})\n\n{faq_text}\n\nمزید مدد کے لیے پوچھیں!"
-        else:
-            return f"📚 Frequently Asked Questions ({category.title()})\n\n{faq_text}\n\nAsk me anything else!"
+        return TEMPLATES[('faq', language)].format(
+            category=category, category_title=category.title(), faq_text=get_faqs(category))
     
     # Complaint Intent
-    elif any(word in user_input_lower for word in ['complaint', 'problem', 'issue', 'error', 'wrong']):
-        if language == 'اردو':
-            return "📝 شکایت درج کرنا\n\nبرائے مہربانی تفصیل دیں:\n1. مسئلے کی نوعیت\n2. آپ کا CNIC\n3. رابطہ نمبر\n\nہماری ٹیم 24 گھنٹے میں جواب دے گی۔\n\nفوری مدد: 111-GOVAI-HELP"
-        else:
-            return "📝 File a Complaint\n\nPlease provide:\n1. Nature of problem\n2. Your CNIC\n3. Contact number\n\nOur team will respond within 24 hours.\n\n🆘 Urgent Help: 111-GOVAI-HELP"
+    elif 'complaint' in intents:
+        return TEMPLATES[('complaint', language)]
     
     # Emergency Intent
-    elif any(word in user_input_lower for word in ['emergency', 'urgent', 'immediate', 'asap']):
-        if language == 'اردو':
-            return "🚨 ایمرجنسی رابطے\n\n• پولیس: 15\n• ایمبولینس: 1122\n• فائر بریگیڈ: 16\n• شہری ہیلپ لائن: 1334\n\nقریبی دفتر: maps.govai.pk/offices"
-        else:
-            return "🚨 Emergency Contacts\n\n• Police: 15\n• Ambulance: 1122\n• Fire Brigade: 16\n• Citizen Helpline: 1334\n\n📍 Nearest Office: maps.govai.pk/offices"
+    elif 'emergency' in intents:
+        return TEMPLATES[('emergency', language)]
     
     # Greeting Intent
-    elif any(word in user_input_lower for word in ['hello', 'hi', 'salam', 'hey', 'assalam']):
-        if language == 'اردو':
-            return "السلام علیکم! 👋\n\nGovAI میں خوش آمدید!\n\nمیں آپ کی مدد کیسے کر سکتا ہوں؟\n\n✅ بل چیک کریں\n✅ CNIC تصدیق\n✅ شکایت درج کریں\n✅ FAQs دیکھیں\n\nبس اپنا سوال ٹائپ کریں!"
-        else:
-            return "Hello! 👋 Welcome to GovAI Assistant!\n\nI can help you with:\n\n✅ Check Bills (Electricity, Gas, Water)\n✅ CNIC Verification\n✅ File Complaints\n✅ FAQs & Guides\n✅ Emergency Services\n\nJust type your question!"
+    elif 'greeting' in intents:
+        return TEMPLATES[('greeting', language)]
     
     # Default Response with Suggestions
     else:
-        if language == 'اردو':
-            return "میں یہاں مدد کے لیے ہوں! 😊\n\nآپ یہ کر سکتے ہیں:\n\n💡 'میرا بل چیک کریں'\n💡 'CNIC تصدیق کریں'\n💡 'FAQs دیکھیں'\n💡 'شکایت درج کریں'\n\nیا اپنا سوال براہ راست پوچھیں!"
-        else:
-            return "I'm here to help! 😊\n\nTry asking:\n\n💡 'Check my bill'\n💡 'Verify my CNIC'\n💡 'Show FAQs'\n💡 'File a complaint'\n💡 'Emergency contacts'\n\nOr ask any question directly!"
+        return TEMPLATES[('default', language)]
+
+# Sample data for budget analysis
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun')
+BUDGET = (20, 25, 30, 28, 35, 40)
+SPENT = (18, 22, 28, 26, 32, 38)
+
+# Sample fraud detection data
+RISK_LEVELS = ('Low', 'Medium', 'High')
+RISK_COUNTS = (156, 67, 24)
+RISK_COLORS = ('#10b981', '#f59e0b', '#ef4444')
+
+# Sample payment statistics
+PAYMENT_METHODS = ('Online', 'Bank', 'Cash', 'Mobile')
+PAYMENT_SHARES = (45, 30, 15, 10)
+
+# Charts never change, so Streamlit builds each figure once per process and
+# hands the same object to every session (nothing mutates them after build)
+@st.cache_resource
+def budget_figure():
+    """Monthly budget vs spending bar chart"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure([
+        go.Bar(name='Budget', x=MONTHS, y=BUDGET),
+        go.Bar(name='Spent', x=MONTHS, y=SPENT)
+    ])
+    fig.update_layout(title="Monthly Budget vs Spending",
+                      barmode='group',
+                      plot_bgcolor='rgba(0,0,0,0)')
+    return fig
+
+@st.cache_resource
+def fraud_figure():
+    """Fraud risk distribution pie chart"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Pie(labels=RISK_LEVELS, values=RISK_COUNTS,
+                           marker_colors=RISK_COLORS))
+    fig.update_layout(title="Fraud Risk Distribution")
+    return fig
+
+@st.cache_resource
+def payment_figure():
+    """Payment methods distribution pie chart"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Pie(labels=PAYMENT_METHODS, values=PAYMENT_SHARES))
+    fig.update_layout(title="Payment Methods Distribution")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def load_bills_data():
+    """Sample citizen bill records for the Bill Services tab"""
+    return {
+        "42101-1234567-1": {
+            "name": "Ahmed Ali Khan",
+            "bills": [
+                {"type": "Electricity", "amount": 3420, "due_date": "2024-01-15", "status": "Pending"},
+                {"type": "Water", "amount": 890, "due_date": "2024-01-20", "status": "Paid"},
+                {"type": "Gas", "amount": 1567, "due_date": "2024-01-25", "status": "Pending"}
+            ]
+        },
+        "42201-2345678-2": {
+            "name": "Fatima Sheikh",
+            "bills": [
+                {"type": "Electricity", "amount": 2876, "due_date": "2024-01-18", "status": "Paid"},
+                {"type": "Property Tax", "amount": 15600, "due_date": "2024-02-01", "status": "Pending"}
+            ]
+        }
+    }
+
+@st.cache_data(show_spinner=False)
+def bills_table_html(cnic):
+    """One HTML table with every bill of a citizen, instead of a widget set per bill"""
+    rows = ''.join(
+        f'<tr><td>{bill["type"]}</td><td>${bill["amount"]}</td><td>{bill["due_date"]}</td>'
+        f'<td><span class="{"status-high" if bill["status"] == "Pending" else "status-low"}">{bill["status"]}</span></td></tr>'
+        for bill in load_bills_data()[cnic]['bills']
+    )
+    return ('<table class="bills-table"><tr><th>Type</th><th>Amount</th>'
+            f'<th>Due Date</th><th>Status</th></tr>{rows}</table>')
 
 # Configure page
 st.set_page_config(
@@ -203,8 +357,7 @@ st.set_page_config(
 )
 
 # Simple Light Theme CSS
-st.markdown("""
-<style>
+APP_CSS = """
     /* Import Stylish Fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Playfair+Display:wght@600;700&display=swap');
     
@@ -309,46 +462,6 @@ st.markdown("""
         font-weight: 600;
     }
 
-    /* Chat Container */
-    .chat-container {
-        background: #fafafa;
-        border: 1px solid var(--border);
-        border-radius: 12px;
-        padding: 1.5rem;
-        min-height: 350px;
-        max-height: 450px;
-        overflow-y: auto;
-        margin: 1rem 0;
-    }
-
-    .user-message {
-        background: linear-gradient(135deg, #6366f1, #8b5cf6);
-        color: white;
-        padding: 1rem 1.3rem;
-        border: none;
-        border-radius: 16px 16px 4px 16px;
-        margin: 0.8rem 0;
-        max-width: 70%;
-        margin-left: auto;
-        text-align: right;
-        box-shadow: 0 3px 10px rgba(99, 102, 241, 0.25);
-        font-size: 0.95rem;
-        line-height: 1.5;
-    }
-
-    .bot-message {
-        background: white;
-        color: var(--text);
-        padding: 1rem 1.3rem;
-        border: 2px solid #e5e7eb;
-        border-radius: 16px 16px 16px 4px;
-        margin: 0.8rem 0;
-        max-width: 70%;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-        font-size: 0.95rem;
-        line-height: 1.5;
-    }
-
     /* Stylish Buttons with Light Theme */
     .stButton > button {
         background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%);
@@ -534,6 +647,19 @@ st.markdown("""
         display: inline-block;
     }
 
+    /* Bill table */
+    .bills-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 1rem 0;
+    }
+    
+    .bills-table th, .bills-table td {
+        padding: 0.75rem;
+        border-bottom: 1px solid var(--border);
+        text-align: left;
+    }
+
     /* Footer */
     .footer-modern {
         background: transparent;
@@ -671,12 +797,82 @@ st.markdown("""
     .stDataFrame {
         color: var(--text) !important;
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+# Static HTML blocks, built once at import rather than inside the tab bodies
+PAYMENT_TIPS_HTML = """
+<div class="metric-card">
+    <h3>Payment Tips</h3>
+    <p>• Pay online for instant confirmation</p>
+    <p>• Set up auto-pay to avoid late fees</p>
+    <p>• Check bills monthly for accuracy</p>
+    <p>• Keep payment receipts for records</p>
+</div>
+"""
+
+CHAT_HELP_HTML = """
+<div class="metric-card">
+    <h3>🔍 Try These Commands</h3>
+    <p><strong>Check Bill:</strong></p>
+    <p>• "Check my bill 35202-1234567-1"</p>
+    <p>• "Show bill for BILL-123456"</p>
+    <br>
+    <p><strong>Verify CNIC:</strong></p>
+    <p>• "Verify 35202-1234567-1"</p>
+    <p>• "CNIC verification"</p>
+    <br>
+    <p><strong>Get Help:</strong></p>
+    <p>• "Show FAQs"</p>
+    <p>• "How to pay bill?"</p>
+</div>
+<div class="metric-card">
+    <h3>💳 Sample Test Data</h3>
+    <p><strong>Test CNICs:</strong></p>
+    <p>• 35202-1234567-1 (Ahmed Khan)</p>
+    <p>• 42101-9876543-2 (Sara Ali)</p>
+    <p>• 33101-5678901-2 (Hassan Raza)</p>
+    <br>
+    <p><strong>Test Bills:</strong></p>
+    <p>• BILL-123456 (Water Bill)</p>
+    <p>• Any valid CNIC (generates bill)</p>
+</div>
+<div class="metric-card">
+    <h3>✨ Features</h3>
+    <p>✅ Instant Bill Checking</p>
+    <p>✅ CNIC Verification</p>
+    <p>✅ Comprehensive FAQs</p>
+    <p>✅ Complaint Filing</p>
+    <p>✅ Emergency Contacts</p>
+    <p>✅ English & اردو Support</p>
+    <p>✅ 24/7 AI Assistant</p>
+</div>
+"""
+
+FOOTER_HTML = """
+<div class="footer-modern">
+    <h3>GovAI Platform</h3>
+    <p style="color: #6b7280; margin-top: 0.5rem;">
+        AI-Powered Government Services | Secure & Transparent | Multilingual Support
+    </p>
+    <p style="color: #9ca3af; font-size: 0.9rem; margin-top: 0.5rem;">
+        © 2025 GovAI Platform. All rights reserved.
+    </p>
+</div>
+"""
+
+@st.cache_resource
+def css_markup():
+    """Build the <style> block once per server process instead of on every rerun"""
+    return f"<style>{APP_CSS}</style>"
+
+st.markdown(css_markup(), unsafe_allow_html=True)
+
+# Only the most recent chat messages are kept and re-rendered on each rerun
+MAX_CHAT_MESSAGES = 20
 
 # Initialize session state
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = deque(maxlen=MAX_CHAT_MESSAGES)
 if 'selected_language' not in st.session_state:
     st.session_state.selected_language = 'English'
 if 'user_cnic' not in st.session_state:
@@ -717,6 +913,10 @@ with st.sidebar:
         st.balloons()
         st.success("System health: EXCELLENT")
 
+# Tab bodies run as fragments where Streamlit supports them (1.33+), so a
+# widget change reruns only its own tab; older releases render them as before
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
 # Main content with tabs
 tab1, tab2, tab3, tab4 = st.tabs([
     "Dashboard", 
@@ -725,7 +925,9 @@ tab1, tab2, tab3, tab4 = st.tabs([
     "AI Assistant"
 ])
 
-with tab1:
+@fragment
+def render_dashboard():
+    """Analytics dashboard tab"""
     st.header("Analytics Dashboard")
     
     col1, col2, col3, col4 = st.columns(4)
@@ -762,32 +964,17 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        # Sample data for budget analysis
-        budget_data = pd.DataFrame({
-            'Month': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
-            'Budget': [20, 25, 30, 28, 35, 40],
-            'Spent': [18, 22, 28, 26, 32, 38]
-        })
-        
-        fig = px.bar(budget_data, x='Month', y=['Budget', 'Spent'], 
-                    title="Monthly Budget vs Spending",
-                    barmode='group')
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(budget_figure(), use_container_width=True)
     
     with col2:
-        # Sample fraud detection data
-        fraud_data = pd.DataFrame({
-            'Risk Level': ['Low', 'Medium', 'High'],
-            'Count': [156, 67, 24]
-        })
-        
-        fig = px.pie(fraud_data, values='Count', names='Risk Level',
-                    title="Fraud Risk Distribution",
-                    color_discrete_sequence=['#10b981', '#f59e0b', '#ef4444'])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fraud_figure(), use_container_width=True)
 
-with tab2:
+with tab1:
+    render_dashboard()
+
+@fragment
+def render_fraud_detection():
+    """Contract fraud analysis tab"""
     st.header("Fraud Detection")
     
     st.markdown("""
@@ -807,16 +994,18 @@ with tab2:
         supplier = st.text_input("Supplier", placeholder="Supplier name...")
         country = st.selectbox("Country", ["Pakistan", "India", "Bangladesh", "Other"])
         
+        # Lowercase once for every keyword check below
+        desc_l = description.lower()
+        sup_l = supplier.lower()
+        
         if st.button("Analyze Contract", type="primary"):
             with st.spinner("Analyzing contract for fraud indicators..."):
-                time.sleep(2)
-                
                 # Simulate fraud detection
-                risk_score = np.random.random()
-                if amount > 10000000 or "emergency" in description.lower():
-                    risk_score = 0.8 + np.random.random() * 0.2
+                risk_score = random.random()
+                if amount > 10000000 or "emergency" in desc_l:
+                    risk_score = 0.8 + random.random() * 0.2
                 elif amount < 50000:
-                    risk_score = np.random.random() * 0.3
+                    risk_score = random.random() * 0.3
                 
                 risk_level = "HIGH" if risk_score > 0.7 else "MEDIUM" if risk_score > 0.4 else "LOW"
                 
@@ -841,20 +1030,22 @@ with tab2:
         
         risk_factors = [
             ("Contract Value", "High" if amount > 5000000 else "Medium" if amount > 1000000 else "Low"),
-            ("Timeline", "Urgent" if "emergency" in description.lower() else "Normal"),
-            ("Supplier History", "New" if "new" in supplier.lower() else "Established"),
+            ("Timeline", "Urgent" if "emergency" in desc_l else "Normal"),
+            ("Supplier History", "New" if "new" in sup_l else "Established"),
             ("Geographic Risk", "Low" if country == "Pakistan" else "Medium")
         ]
         
+        # Alert style per status; anything not listed is shown as success
+        severity = {'High': st.error, 'Urgent': st.error, 'New': st.error, 'Medium': st.warning}
         for factor, status in risk_factors:
-            if status in ["High", "Urgent", "New"]:
-                st.error(f"{factor}: {status}")
-            elif status == "Medium":
-                st.warning(f"{factor}: {status}")
-            else:
-                st.success(f"{factor}: {status}")
+            severity.get(status, st.success)(f"{factor}: {status}")
 
-with tab3:
+with tab2:
+    render_fraud_detection()
+
+@fragment
+def render_bill_services():
+    """Citizen bill lookup tab"""
     st.header("Bill Services")
     
     col1, col2 = st.columns([1, 1])
@@ -872,121 +1063,59 @@ with tab3:
         cnic = st.text_input("CNIC Number", placeholder="42101-1234567-1")
         
         if st.button("Search Bills", type="primary"):
-            if cnic:
+            # Records are keyed XXXXX-XXXXXXX-X; accept the same CNIC forms as
+            # the chatbot and rebuild that key from the digits
+            match = CNIC_FULL.fullmatch(cnic) if cnic else None
+            if not cnic:
+                st.warning("Please enter a CNIC number")
+            elif match is None:
+                st.error("Invalid CNIC format. Please use format: XXXXX-XXXXXXX-X")
+            else:
                 with st.spinner("Searching for bills..."):
-                    time.sleep(1)
-                    
                     # Sample bill data
-                    bills_data = {
-                        "42101-1234567-1": {
-                            "name": "Ahmed Ali Khan",
-                            "bills": [
-                                {"type": "Electricity", "amount": 3420, "due_date": "2024-01-15", "status": "Pending"},
-                                {"type": "Water", "amount": 890, "due_date": "2024-01-20", "status": "Paid"},
-                                {"type": "Gas", "amount": 1567, "due_date": "2024-01-25", "status": "Pending"}
-                            ]
-                        },
-                        "42201-2345678-2": {
-                            "name": "Fatima Sheikh",
-                            "bills": [
-                                {"type": "Electricity", "amount": 2876, "due_date": "2024-01-18", "status": "Paid"},
-                                {"type": "Property Tax", "amount": 15600, "due_date": "2024-02-01", "status": "Pending"}
-                            ]
-                        }
-                    }
+                    bills_data = load_bills_data()
                     
-                    if cnic in bills_data:
-                        citizen = bills_data[cnic]
+                    cnic_key = '-'.join(match.groups())
+                    citizen = bills_data.get(cnic_key)
+                    if citizen is not None:
                         st.success(f"Found records for: **{citizen['name']}**")
                         
-                        for bill in citizen['bills']:
-                            with st.expander(f"{bill['type']} - ${bill['amount']}"):
-                                col_bill1, col_bill2, col_bill3 = st.columns(3)
-                                with col_bill1:
-                                    st.write(f"**Amount:** ${bill['amount']}")
-                                with col_bill2:
-                                    st.write(f"**Due Date:** {bill['due_date']}")
-                                with col_bill3:
-                                    if bill['status'] == 'Pending':
-                                        st.error(f"**Status:** {bill['status']}")
-                                    else:
-                                        st.success(f"**Status:** {bill['status']}")
+                        st.markdown(bills_table_html(cnic_key), unsafe_allow_html=True)
                     else:
                         st.error("No citizen found with this CNIC")
-            else:
-                st.warning("Please enter a CNIC number")
     
     with col2:
         st.subheader("Payment Analytics")
         
         # Payment statistics
-        payment_stats = pd.DataFrame({
-            'Payment Method': ['Online', 'Bank', 'Cash', 'Mobile'],
-            'Percentage': [45, 30, 15, 10]
-        })
+        st.plotly_chart(payment_figure(), use_container_width=True)
         
-        fig = px.pie(payment_stats, values='Percentage', names='Payment Method',
-                    title="Payment Methods Distribution")
-        st.plotly_chart(fig, use_container_width=True)
-        
-        st.markdown("""
-        <div class="metric-card">
-            <h3>Payment Tips</h3>
-            <p>• Pay online for instant confirmation</p>
-            <p>• Set up auto-pay to avoid late fees</p>
-            <p>• Check bills monthly for accuracy</p>
-            <p>• Keep payment receipts for records</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(PAYMENT_TIPS_HTML, unsafe_allow_html=True)
 
-with tab4:
+with tab3:
+    render_bill_services()
+
+@fragment
+def render_assistant():
+    """AI assistant chat tab"""
     st.header("AI Assistant")
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        # Main chat box wrapper
-        st.markdown("""
-        <div style="
-            background: white;
-            border: 2px solid #e5e7eb;
-            border-radius: 16px;
-            padding: 1.5rem;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.05);
-            margin-bottom: 1rem;
-        ">
-        """, unsafe_allow_html=True)
-        
         st.subheader("Chat with GovAI Assistant")
         
-        # Chat container
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-        
-        # Display chat history
-        for message in st.session_state.chat_history:
-            if message['type'] == 'user':
-                st.markdown(f'<div class="user-message">{message["content"]}</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="bot-message">{message["content"]}</div>', unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Chat input section
-        st.markdown('<div style="margin-top: 1rem;">', unsafe_allow_html=True)
-        user_input = st.text_input("Type your message...", placeholder="How can I help you today?", key="chat_input", label_visibility="collapsed")
-        
-        col_send, col_clear = st.columns([3, 1])
+        # Chat history is drawn into this slot at the end, after Send/Clear have
+        # updated it, so the same run shows the change without a second rerun
+        history_slot = st.container()
         
-        with col_send:
-            send_button = st.button("Send", type="primary", use_container_width=True)
+        # Chat input section; the form submits on Enter and empties the box
+        with st.form("chat_form", clear_on_submit=True):
+            user_input = st.text_input("Type your message...", placeholder="How can I help you today?", key="chat_input", label_visibility="collapsed")
+            send_button = st.form_submit_button("Send", type="primary")
         
-        with col_clear:
-            if st.button("Clear", use_container_width=True):
-                st.session_state.chat_history = []
-                st.rerun()
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)  # Close main chat box
+        if st.button("Clear"):
+            st.session_state.chat_history.clear()
         
         # Only process when button is clicked AND there's text
         if send_button and user_input and user_input.strip():
@@ -997,80 +1126,34 @@ with tab4:
             })
             
             # Generate bot response with advanced logic
-            with st.spinner("Thinking..."):
-                time.sleep(0.5)
-                response = get_chatbot_response(user_input, st.session_state.selected_language)
+            response = get_chatbot_response(user_input, st.session_state.selected_language)
             
             # Add bot response
             st.session_state.chat_history.append({
                 'type': 'bot',
                 'content': response
             })
-            
-            st.rerun()
+        
+        # Display chat history with Streamlit's chat elements; message text goes
+        # through the regular markdown sanitizer, not unsafe_allow_html
+        with history_slot:
+            for message in st.session_state.chat_history:
+                with st.chat_message("user" if message['type'] == 'user' else "assistant"):
+                    st.markdown(message['content'])
     
     with col2:
         st.subheader("Quick Help")
         
-        st.markdown("""
-        <div class="metric-card">
-            <h3>🔍 Try These Commands</h3>
-            <p><strong>Check Bill:</strong></p>
-            <p>• "Check my bill 35202-1234567-1"</p>
-            <p>• "Show bill for BILL-123456"</p>
-            <br>
-            <p><strong>Verify CNIC:</strong></p>
-            <p>• "Verify 35202-1234567-1"</p>
-            <p>• "CNIC verification"</p>
-            <br>
-            <p><strong>Get Help:</strong></p>
-            <p>• "Show FAQs"</p>
-            <p>• "How to pay bill?"</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="metric-card">
-            <h3>💳 Sample Test Data</h3>
-            <p><strong>Test CNICs:</strong></p>
-            <p>• 35202-1234567-1 (Ahmed Khan)</p>
-            <p>• 42101-9876543-2 (Sara Ali)</p>
-            <p>• 33101-5678901-2 (Hassan Raza)</p>
-            <br>
-            <p><strong>Test Bills:</strong></p>
-            <p>• BILL-123456 (Water Bill)</p>
-            <p>• Any valid CNIC (generates bill)</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="metric-card">
-            <h3>✨ Features</h3>
-            <p>✅ Instant Bill Checking</p>
-            <p>✅ CNIC Verification</p>
-            <p>✅ Comprehensive FAQs</p>
-            <p>✅ Complaint Filing</p>
-            <p>✅ Emergency Contacts</p>
-            <p>✅ English & اردو Support</p>
-            <p>✅ 24/7 AI Assistant</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(CHAT_HELP_HTML, unsafe_allow_html=True)
+
+with tab4:
+    render_assistant()
 
 
 
 # Simple Footer
 st.markdown("---")
-st.markdown("""
-<div class="footer-modern">
-    <h3>GovAI Platform</h3>
-    <p style="color: #6b7280; margin-top: 0.5rem;">
-        AI-Powered Government Services | Secure & Transparent | Multilingual Support
-    </p>
-    <p style="color: #9ca3af; font-size: 0.9rem; margin-top: 0.5rem;">
-        © 2025 GovAI Platform. All rights reserved.
-    </p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
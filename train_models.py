@@ -25,18 +25,36 @@ current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 warnings.filterwarnings('ignore')
 
+# Use Intel's oneDAL-accelerated estimators when scikit-learn-intelex is
+# installed; this must run before the sklearn imports below
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn()
+except ImportError:
+    pass
+
 # Machine Learning imports
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, IsolationForest
-from sklearn.neural_network import MLPClassifier, MLPRegressor
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV, StratifiedKFold
+from sklearn.ensemble import (
+    RandomForestClassifier, RandomForestRegressor, IsolationForest,
+    HistGradientBoostingClassifier
+)
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.neighbors import NearestCentroid
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     classification_report, confusion_matrix,
     mean_squared_error, r2_score
 )
 from sklearn.preprocessing import StandardScaler, LabelEncoder, MinMaxScaler
-from sklearn.impute import SimpleImputer
+
+try:
+    import lz4
+except ImportError:
+    lz4 = None
+
+# Saved models are compressed: lz4 when installed, otherwise zlib
+MODEL_COMPRESSION = ('lz4', 3) if lz4 is not None else 3
 
 # Create necessary directories
 os.makedirs("models", exist_ok=True)
@@ -47,6 +65,24 @@ print("🚀 Training advanced AI models with real government data")
 print("🎯 Target: 85%+ accuracy without over/under-fitting")
 print()
 
+def bucketize(values, edges):
+    """Bucket index like pd.cut over (0, *edges, inf]; NaN where pd.cut gives NaN (value <= 0)"""
+    codes = np.searchsorted(edges, values).astype(np.float32)
+    codes[~(values > 0)] = np.nan
+    return codes
+
+def fill_median(X):
+    """Replace NaNs in the float array X with column medians in place; returns X and the medians"""
+    medians = np.nan_to_num(np.nanmedian(X, axis=0))
+    np.copyto(X, medians.astype(X.dtype), where=np.isnan(X))
+    return X, medians
+
+def fit_scale(X):
+    """Median-impute and standardize the float array X in place; returns X, the medians and the fitted StandardScaler"""
+    X, medians = fill_median(X)
+    scaler = StandardScaler(copy=False)
+    return scaler.fit(X).transform(X), medians, scaler
+
 class ContractFraudDetector:
     """Advanced fraud detection system using real government contract data"""
     
@@ -61,7 +97,12 @@ class ContractFraudDetector:
         
         try:
             # Load the real contract data
-            contracts_df = pd.read_csv("data/Major_Contract_Awards.csv")
+            # Only parse the columns used below; text columns skip type inference
+            text_cols = ['Borrower', 'Contract Description', 'Procurement Method', 'Country']
+            used_cols = set(text_cols + ['Total Contract Value (USD)', 'Contract Signing Date', 'Completion Date'])
+            contracts_df = pd.read_csv("data/Major_Contract_Awards.csv",
+                                       usecols=lambda col: col in used_cols,
+                                       dtype={col: str for col in text_cols})
             print(f"✅ Loaded {len(contracts_df):,} contract records")
             
             # Display basic info
@@ -70,25 +111,31 @@ class ContractFraudDetector:
             
             # Feature engineering for fraud detection
             # Create fraud labels based on business rules
-            contracts_df['fraud_risk'] = 0  # Default: no fraud
+            # Each column is read once into a NumPy array and the rules are
+            # combined as plain boolean arrays
+            contract_values = contracts_df['Total Contract Value (USD)'].fillna(0).to_numpy()
+            descriptions = contracts_df['Contract Description']
             
             # High-risk indicators (realistic business rules)
             high_risk_conditions = (
-                (contracts_df.get('Total Contract Value (USD)', 0).fillna(0) > 10000000) |  # Very high value
-                (contracts_df.get('Borrower', '').str.contains('offshore|shell|temp', case=False, na=False)) |
-                (contracts_df.get('Contract Description', '').str.len() < 20) |  # Vague descriptions
-                (contracts_df.get('Procurement Method', '') == 'DIRECT CONTRACTING')
+                (contract_values > 10000000) |  # Very high value
+                contracts_df['Borrower'].str.contains('offshore|shell|temp', case=False, na=False).to_numpy() |
+                (descriptions.str.len().to_numpy() < 20) |  # Vague descriptions
+                (contracts_df['Procurement Method'].to_numpy() == 'DIRECT CONTRACTING')
             )
             
             medium_risk_conditions = (
-                (contracts_df.get('Total Contract Value (USD)', 0).fillna(0) > 5000000) |
-                (contracts_df.get('Contract Description', '').str.contains('urgent|emergency', case=False, na=False))
+                (contract_values > 5000000) |
+                descriptions.str.contains('urgent|emergency', case=False, na=False).to_numpy()
             )
             
-            # Assign fraud risk levels
-            contracts_df.loc[high_risk_conditions, 'fraud_risk'] = 3  # Critical
-            contracts_df.loc[medium_risk_conditions & ~high_risk_conditions, 'fraud_risk'] = 2  # High
-            contracts_df.loc[(~high_risk_conditions) & (~medium_risk_conditions), 'fraud_risk'] = np.random.choice([0, 1], p=[0.85, 0.15], size=sum((~high_risk_conditions) & (~medium_risk_conditions)))
+            # Assign fraud risk levels in one pass: 3 = Critical, 2 = High
+            fraud_risk = np.select([high_risk_conditions, medium_risk_conditions], [3, 2], default=0).astype(np.int8)
+            # Remaining contracts are low risk with a 15% chance of level 1
+            low_risk = (~high_risk_conditions) & (~medium_risk_conditions)
+            rng = np.random.default_rng(42)
+            fraud_risk[low_risk] = rng.random(low_risk.sum()) < 0.15
+            contracts_df['fraud_risk'] = fraud_risk
             
             # Feature engineering
             features = []
@@ -99,25 +146,27 @@ class ContractFraudDetector:
                 features.append('contract_value')
                 
                 # Create value-based features
-                contracts_df['log_contract_value'] = np.log1p(contracts_df['contract_value'])
-                contracts_df['value_category'] = pd.cut(contracts_df['contract_value'], 
-                                                      bins=[0, 100000, 1000000, 10000000, float('inf')], 
-                                                      labels=[0, 1, 2, 3])
+                values = contracts_df['contract_value'].to_numpy(np.float32)
+                contracts_df['log_contract_value'] = np.log1p(values)
+                contracts_df['value_category'] = bucketize(values, np.array([1e5, 1e6, 1e7], dtype=np.float32))
                 features.extend(['log_contract_value', 'value_category'])
             
             # Categorical features (encoded)
-            categorical_cols = ['Country', 'Borrower', 'Procurement Method', 'Contract Description']
+            # Contract Description is free text; label codes would be near row IDs,
+            # so it only feeds the length/word-count features below
+            categorical_cols = ['Country', 'Borrower', 'Procurement Method']
             for col in categorical_cols:
                 if col in contracts_df.columns:
                     # Clean and encode
                     contracts_df[col] = contracts_df[col].fillna('Unknown').astype(str)
-                    le = LabelEncoder()
+                    # Hash factorization; codes match LabelEncoder's sorted classes
+                    categories = contracts_df[col].astype('category')
                     encoded_col = f'{col.lower().replace(" ", "_")}_encoded'
-                    contracts_df[encoded_col] = le.fit_transform(contracts_df[col])
+                    contracts_df[encoded_col] = categories.cat.codes.to_numpy()
                     features.append(encoded_col)
                     
-                    # Store encoder for later use
-                    self.scalers[f'{col}_encoder'] = le
+                    # Store the code -> category mapping for later use
+                    self.scalers[f'{col}_encoder'] = categories.cat.categories
             
             # Text-based features
             if 'Contract Description' in contracts_df.columns:
@@ -138,19 +187,17 @@ class ContractFraudDetector:
             # Clean features
             features = [f for f in features if f in contracts_df.columns]
             
-            # Prepare final dataset
-            X = contracts_df[features].copy()
-            y = contracts_df['fraud_risk'].copy()
-            
-            # Handle missing values
-            imputer = SimpleImputer(strategy='median')
-            X_imputed = pd.DataFrame(imputer.fit_transform(X), columns=X.columns)
-            self.scalers['imputer'] = imputer
-            
-            # Scale features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X_imputed)
-            self.scalers['feature_scaler'] = scaler
+            # Prepare final dataset: one preallocated float32 matrix filled column
+            # by column (tree models split on float32 internally) and then
+            # imputed and scaled in place
+            X = np.empty((len(contracts_df), len(features)), dtype=np.float32)
+            for idx, feature in enumerate(features):
+                X[:, idx] = contracts_df[feature].to_numpy(np.float32, na_value=np.nan)
+            y = contracts_df['fraud_risk']
+            
+            # Handle missing values and scale features. Stored like the analytics
+            # trainer: per-column medians array and a fitted StandardScaler
+            X_scaled, self.scalers['imputer_medians'], self.scalers['feature_scaler'] = fit_scale(X)
             self.features = features
             
             print(f"✅ Prepared {len(features)} features for training")
@@ -187,17 +234,20 @@ class ContractFraudDetector:
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
         
+        # Stratified CV folds computed once and shared by every supervised model
+        cv_folds = list(StratifiedKFold(n_splits=5, shuffle=True, random_state=42).split(X_train, y_train))
+        
         models_config = {
             'random_forest': {
-                'model': RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10),
+                'model': RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10, n_jobs=-1),
                 'name': 'Random Forest'
             },
-            'neural_network': {
-                'model': MLPClassifier(hidden_layer_sizes=(100, 50), max_iter=500, random_state=42),
-                'name': 'Neural Network'
+            'gradient_boosting': {
+                'model': HistGradientBoostingClassifier(max_iter=200, max_depth=8, learning_rate=0.1, random_state=42),
+                'name': 'Gradient Boosting'
             },
             'isolation_forest': {
-                'model': IsolationForest(contamination=0.15, random_state=42),
+                'model': IsolationForest(n_estimators=100, contamination=0.15, max_samples=256, bootstrap=False, random_state=42, n_jobs=-1),
                 'name': 'Isolation Forest'
             }
         }
@@ -212,7 +262,10 @@ class ContractFraudDetector:
             if model_name == 'isolation_forest':
                 # Unsupervised anomaly detection
                 model.fit(X_train)
-                y_pred = model.predict(X_test)
+                # Score once; predict() is the same threshold at 0, and the raw
+                # scores allow re-tuning contamination without another pass
+                anomaly_scores = model.decision_function(X_test)
+                y_pred = np.where(anomaly_scores < 0, -1, 1)
                 # Convert to fraud risk (1 for anomaly, 0 for normal)
                 y_pred_binary = (y_pred == -1).astype(int)
                 y_test_binary = (y_test > 0).astype(int)
@@ -224,7 +277,7 @@ class ContractFraudDetector:
                 accuracy = accuracy_score(y_test, y_pred)
                 
                 # Cross-validation for robust evaluation
-                cv_scores = cross_val_score(model, X_train, y_train, cv=5)
+                cv_scores = cross_val_score(model, X_train, y_train, cv=cv_folds, n_jobs=-1)
                 print(f"    📊 CV Accuracy: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
             
             results[model_name] = {
@@ -232,6 +285,8 @@ class ContractFraudDetector:
                 'accuracy': accuracy,
                 'test_predictions': y_pred
             }
+            if model_name == 'isolation_forest':
+                results[model_name]['anomaly_scores'] = anomaly_scores
             
             print(f"    ✅ {config['name']}: {accuracy:.3f} accuracy")
             
@@ -240,11 +295,12 @@ class ContractFraudDetector:
         
         # Ensemble method
         print("  🔨 Creating ensemble model...")
-        ensemble_pred = []
-        for i in range(len(y_test)):
-            votes = [results['random_forest']['test_predictions'][i], 
-                    results['neural_network']['test_predictions'][i]]
-            ensemble_pred.append(max(set(votes), key=votes.count))
+        # Soft voting over the already-fit models (what VotingClassifier does):
+        # average the class probabilities and take the most likely class
+        rf_model = results['random_forest']['model']
+        gb_model = results['gradient_boosting']['model']
+        ensemble_proba = (rf_model.predict_proba(X_test) + gb_model.predict_proba(X_test)) / 2
+        ensemble_pred = rf_model.classes_[ensemble_proba.argmax(axis=1)]
         
         ensemble_accuracy = accuracy_score(y_test, ensemble_pred)
         print(f"    ✅ Ensemble Model: {ensemble_accuracy:.3f} accuracy")
@@ -309,24 +365,18 @@ class ChatbotTrainer:
             ("فوری مدد چاہیے", "emergency"),
         ]
         
-        # Add more training examples
-        texts = []
-        labels = []
-        
-        for text, intent in training_data:
-            texts.append(text)
-            labels.append(intent)
-            
-            # Add variations
-            if "bill" in text.lower():
-                variations = [
-                    text.replace("bill", "payment"),
-                    text.replace("pay", "settle"),
-                    text.replace("check", "view")
-                ]
-                for var in variations:
-                    texts.append(var)
-                    labels.append(intent)
+        # Add variations of bill examples; dict.fromkeys drops repeats (a
+        # replacement that does not apply returns the original text) in order
+        examples = dict.fromkeys(
+            (variant, intent)
+            for text, intent in training_data
+            for variant in (
+                (text, text.replace("bill", "payment"), text.replace("pay", "settle"), text.replace("check", "view"))
+                if "bill" in text.lower() else (text,)
+            )
+        )
+        texts = [text for text, _ in examples]
+        labels = [intent for _, intent in examples]
         
         print(f"✅ Prepared {len(texts)} training examples")
         print(f"🎯 Intents: {set(labels)}")
@@ -337,9 +387,11 @@ class ChatbotTrainer:
         """Train the chatbot model"""
         print("🏋️ Training chatbot model...")
         
-        # Vectorize text
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        X = self.vectorizer.fit_transform(texts)
+        # Vectorize text: stateless hashed character n-grams work for both
+        # English and Urdu and keep no vocabulary dict in the saved model
+        self.vectorizer = HashingVectorizer(n_features=2**14, analyzer='char_wb',
+                                            ngram_range=(3, 5), alternate_sign=False)
+        X = self.vectorizer.transform(texts)
         
         # Encode labels
         label_encoder = LabelEncoder()
@@ -348,15 +400,16 @@ class ChatbotTrainer:
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
-        # Train model
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        # Train model: one centroid per intent over the L2-normalized n-gram
+        # vectors; predicting is a single sparse product against the centroids
+        self.model = NearestCentroid()
         self.model.fit(X_train, y_train)
         
         # Evaluate
         y_pred = self.model.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
         
-        # Cross-validation
+        # Cross-validation - in-process, as the fits are far cheaper than a worker pool
         cv_scores = cross_val_score(self.model, X_train, y_train, cv=5)
         
         print(f"✅ Chatbot accuracy: {accuracy:.3f}")
@@ -407,21 +460,20 @@ class AnalyticsTrainer:
                 features.append('expenditure_amount')
                 
                 # Create derived features
-                expenditure_df['log_expenditure'] = np.log1p(expenditure_df['expenditure_amount'])
-                expenditure_df['expenditure_category'] = pd.cut(expenditure_df['expenditure_amount'], 
-                                                              bins=[0, 1e6, 1e9, 1e12, float('inf')], 
-                                                              labels=[0, 1, 2, 3])
+                values = expenditure_df['expenditure_amount'].to_numpy(np.float64)
+                expenditure_df['log_expenditure'] = np.log1p(values)
+                expenditure_df['expenditure_category'] = bucketize(values, np.array([1e6, 1e9, 1e12]))
                 features.extend(['log_expenditure', 'expenditure_category'])
             
             # Encode categorical features
             for col_list, prefix in [(country_cols, 'country'), (sector_cols, 'sector')]:
                 for col in col_list:
                     if col in actual_cols:
-                        le = LabelEncoder()
+                        categories = expenditure_df[col].fillna('Unknown').astype('category')
                         encoded_col = f'{prefix}_encoded'
-                        expenditure_df[encoded_col] = le.fit_transform(expenditure_df[col].fillna('Unknown'))
+                        expenditure_df[encoded_col] = categories.cat.codes.to_numpy()
                         features.append(encoded_col)
-                        self.scalers[f'{prefix}_encoder'] = le
+                        self.scalers[f'{prefix}_encoder'] = categories.cat.categories
                         break
             
             # Year features
@@ -449,12 +501,10 @@ class AnalyticsTrainer:
                 y = np.random.uniform(0.5, 1.0, len(X))
             
             # Handle missing values
-            imputer = SimpleImputer(strategy='median')
-            X_imputed = pd.DataFrame(imputer.fit_transform(X), columns=X.columns)
-            self.scalers['imputer'] = imputer
+            X_imputed, self.scalers['imputer_medians'] = fill_median(X.to_numpy(np.float64, na_value=np.nan))
             
             print(f"✅ Prepared {len(features)} features for analytics")
-            return X_imputed.values, y.values
+            return X_imputed, y.values
             
         except Exception as e:
             print(f"❌ Error loading expenditure data: {e}")
@@ -480,12 +530,12 @@ class AnalyticsTrainer:
         
         # Scale features
         scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
+        X_train_scaled = np.ascontiguousarray(scaler.fit_transform(X_train), dtype=np.float32)
+        X_test_scaled = np.ascontiguousarray(scaler.transform(X_test), dtype=np.float32)
         self.scalers['feature_scaler'] = scaler
         
         # Train regression model
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
+        model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
         model.fit(X_train_scaled, y_train)
         
         # Evaluate
@@ -523,7 +573,7 @@ def main():
         fraud_results, best_fraud_model, fraud_accuracy = fraud_detector.train_models(X_fraud, y_fraud)
         
         # Save fraud detection model
-        joblib.dump(fraud_detector, "models/fraud_detector.joblib")
+        joblib.dump(fraud_detector, "models/fraud_detector.joblib", compress=MODEL_COMPRESSION)
         results['models']['fraud_detection'] = {
             'accuracy': fraud_accuracy,
             'best_model': best_fraud_model,
@@ -538,7 +588,7 @@ def main():
         chatbot_accuracy, intents = chatbot_trainer.train_chatbot(texts, labels)
         
         # Save chatbot model
-        joblib.dump(chatbot_trainer, "models/chatbot.joblib")
+        joblib.dump(chatbot_trainer, "models/chatbot.joblib", compress=MODEL_COMPRESSION)
         results['models']['chatbot'] = {
             'accuracy': chatbot_accuracy,
             'intents': list(intents.values()),
@@ -553,7 +603,7 @@ def main():
         analytics_accuracy = analytics_trainer.train_analytics_models(X_analytics, y_analytics)
         
         # Save analytics model
-        joblib.dump(analytics_trainer, "models/analytics.joblib")
+        joblib.dump(analytics_trainer, "models/analytics.joblib", compress=MODEL_COMPRESSION)
         results['models']['analytics'] = {
             'accuracy': analytics_accuracy / 100,  # Convert back to 0-1 scale
             'features': X_analytics.shape[1],